@@ -0,0 +1,47 @@
+"""Searching the file system."""
+from __future__ import annotations
+
+import os
+from typing import Callable, Iterator, Optional
+
+EntryFilter = Callable[[os.DirEntry[str]], bool]
+
+
+def walk_files(
+    root: str,
+    include_file: Optional[EntryFilter] = None,
+    search_directory: Optional[EntryFilter] = None,
+) -> Iterator[os.DirEntry[str]]:
+    """Locate files below a directory, in the same order as os.walk.
+
+    The file type information from scandir is used instead of calling stat
+    again for each item. Like os.walk, symlinks to directories are not
+    followed and directories that cannot be read are skipped.
+
+    Args:
+        root: Directory to search.
+        include_file: Only yield files for which this returns True. Every
+            file is yielded if not set.
+        search_directory: Only search the subdirectories for which this
+            returns True. Every subdirectory is searched if not set.
+
+    Yields:
+        Directory entry of each file located.
+    """
+    directories = [root]
+    while directories:
+        subdirectories = []
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink() and (
+                            search_directory is None or
+                            search_directory(entry)
+                        ):
+                            subdirectories.append(entry.path)
+                    elif include_file is None or include_file(entry):
+                        yield entry
+        except OSError:
+            pass
+        directories.extend(reversed(subdirectories))
@@ -0,0 +1,68 @@
+"""Showing the log messages of other libraries in task logs."""
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+from typing import Callable, Dict, Iterator, Tuple
+
+from speedwagon import utils
+
+_LEVEL_LOCK = threading.Lock()
+
+# Number of contexts open and the original level for each logger name
+_LEVEL_USERS: Dict[str, Tuple[int, int]] = {}
+
+
+@contextlib.contextmanager
+def logger_level(logger: logging.Logger, level: int) -> Iterator[None]:
+    """Make sure a logger passes on messages of a level inside the context.
+
+    The level of a logger is shared by every thread, so it is only changed
+    by the first context opened and is put back when the last one open is
+    closed. Contexts for the same logger can overlap without changing the
+    level under each other.
+
+    Args:
+        logger: Logger to change.
+        level: Lowest level of the messages to pass on.
+    """
+    with _LEVEL_LOCK:
+        users, original = _LEVEL_USERS.get(logger.name, (0, logger.level))
+        if users == 0 and not logger.isEnabledFor(level):
+            logger.setLevel(level)
+        _LEVEL_USERS[logger.name] = (users + 1, original)
+    try:
+        yield
+    finally:
+        with _LEVEL_LOCK:
+            users, original = _LEVEL_USERS.pop(logger.name)
+            if users == 1:
+                logger.setLevel(original)
+            else:
+                _LEVEL_USERS[logger.name] = (users - 1, original)
+
+
+@contextlib.contextmanager
+def thread_log_config(
+    logger: logging.Logger,
+    callback: Callable[[str], None]
+) -> Iterator[None]:
+    """Forward the messages logged by the current thread to a callback.
+
+    Loggers are shared by every thread, so messages logged by other threads
+    while inside the context are left out. This keeps the messages of tasks
+    running at the same time in their own logs.
+
+    Args:
+        logger: Logger to forward the messages from.
+        callback: Called with each message.
+    """
+    owner = threading.get_ident()
+
+    def forward(message: str) -> None:
+        if threading.get_ident() == owner:
+            callback(message)
+
+    with utils.log_config(logger, forward):
+        yield
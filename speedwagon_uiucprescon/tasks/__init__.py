@@ -9,7 +9,9 @@ from .prep import (
 )
 from .validation import (
     ValidateImageMetadataTask,
+    ValidateImageMetadataBatchTask,
     MakeChecksumTask,
+    MakeChecksumBatchTask,
     MakeChecksumResult,
     MakeCheckSumReportTask,
 )
@@ -22,8 +24,10 @@ __all__ = [
     "GenerateChecksumTask",
     "GenerateChecksumTaskResults",
     "ValidateImageMetadataTask",
+    "ValidateImageMetadataBatchTask",
     "AbsFindPackageTask",
     "MakeCheckSumReportTask",
     "MakeChecksumTask",
+    "MakeChecksumBatchTask",
     "MakeChecksumResult",
 ]
@@ -1,7 +1,10 @@
 """Shared checksum tasks."""
+import concurrent.futures
+import hashlib
 import os
+import threading
 import typing
-from typing import Optional, TypedDict
+from typing import List, Optional, TypedDict
 
 from pyhathiprep import checksum
 from uiucprescon import imagevalidate
@@ -15,6 +18,82 @@ MakeChecksumResult = typing.TypedDict("MakeChecksumResult", {
     "checksum_file": str,
 })
 
+# Read size used when hashlib.file_digest is not available
+HASH_READ_SIZE = 256 * 1024
+
+# Hash algorithms that can be used for checksums, sha256 is hardware
+# accelerated by OpenSSL on most current CPUs.
+CHECKSUM_ALGORITHMS = ("md5", "sha256")
+
+# Number of files hashed at the same time by a MakeChecksumBatchTask
+CHECKSUM_WORKERS = os.cpu_count() or 1
+
+
+def calculate_file_hash(file_path: str, algorithm: str = "md5") -> str:
+    """Calculate the hash of a file.
+
+    Args:
+        file_path: Path to the file.
+        algorithm: Name of the hash algorithm, one of CHECKSUM_ALGORITHMS.
+
+    Returns:
+        Hex digest of the file's hash.
+    """
+    with open(file_path, "rb") as file_handle:
+        if hasattr(os, "posix_fadvise"):
+            # Let the kernel read ahead more aggressively since the whole
+            # file is read from start to end.
+            os.posix_fadvise(
+                file_handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL
+            )
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(file_handle, algorithm).hexdigest()
+        file_hash = hashlib.new(algorithm)
+        # Reuse one buffer for every read instead of a new bytes per chunk
+        buffer = bytearray(HASH_READ_SIZE)
+        view = memoryview(buffer)
+        while True:
+            size = file_handle.readinto(buffer)
+            if not size:
+                break
+            file_hash.update(view[:size])
+        return file_hash.hexdigest()
+
+
+class _ThreadProfileValidators(threading.local):
+    # Validators already built by the current thread, by profile name
+    def __init__(self) -> None:
+        super().__init__()
+        self.validators: typing.Dict[str, imagevalidate.Profile] = {}
+
+
+_PROFILE_VALIDATORS = _ThreadProfileValidators()
+
+
+def get_profile_validator(profile_name: str) -> imagevalidate.Profile:
+    """Get the validator for an image validation profile.
+
+    A validator is not thread-safe, because the exiv2 binding used to read
+    the metadata is not known to be safe to use from several threads at
+    once. Each thread therefore builds its own. It is reused for the other
+    files validated on that thread, such as the rest of a batch, but a new
+    thread always builds a new validator.
+
+    Args:
+        profile_name: Name of the validation profile.
+
+    Returns:
+        Validator for the profile.
+    """
+    validators = _PROFILE_VALIDATORS.validators
+    validator = validators.get(profile_name)
+    if validator is None:
+        validator = imagevalidate.Profile(
+            imagevalidate.get_profile(profile_name)
+        )
+        validators[profile_name] = validator
+    return validator
+
 
 class MakeChecksumTask(speedwagon.tasks.Subtask[MakeChecksumResult]):
     """Create a make checksum task."""
@@ -44,9 +123,7 @@ class MakeChecksumTask(speedwagon.tasks.Subtask[MakeChecksumResult]):
         file_to_calculate = os.path.join(item_path, item_file_name)
         result: MakeChecksumResult = {
             "source_filename": item_file_name,
-            "checksum_hash": checksum.calculate_md5_hash(
-                file_to_calculate
-            ),
+            "checksum_hash": calculate_file_hash(file_to_calculate),
             "checksum_file": report_path_to_save_to,
         }
         self.set_results(result)
@@ -54,6 +131,55 @@ class MakeChecksumTask(speedwagon.tasks.Subtask[MakeChecksumResult]):
         return True
 
 
+class MakeChecksumBatchTask(
+    speedwagon.tasks.Subtask[List[MakeChecksumResult]]
+):
+    """Calculate the checksums for a group of files in the same package."""
+
+    name = "Create Checksums"
+
+    def __init__(
+        self,
+        source_path: str,
+        filenames: List[str],
+        checksum_report: str,
+        algorithm: str = "md5",
+    ) -> None:
+        """Create a make checksum batch task."""
+        super().__init__()
+        self._source_path = source_path
+        self._filenames = filenames
+        self._checksum_report = checksum_report
+        self._algorithm = algorithm
+
+    def task_description(self) -> Optional[str]:
+        """Get user readable information about what the subtask is doing."""
+        return f"Calculating checksums for {len(self._filenames)} file(s)"
+
+    def _calculate(self, filename: str) -> MakeChecksumResult:
+        checksum_hash = calculate_file_hash(
+            os.path.join(self._source_path, filename), self._algorithm
+        )
+        self.log(f"Calculated the checksum for {filename}")
+        return {
+            "source_filename": filename,
+            "checksum_hash": checksum_hash,
+            "checksum_file": self._checksum_report,
+        }
+
+    def work(self) -> bool:
+        """Calculate the checksums of every file in the batch."""
+        # hashlib releases the GIL while hashing so the files in the batch
+        # are hashed at the same time.
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=CHECKSUM_WORKERS
+        ) as executor:
+            self.set_results(
+                list(executor.map(self._calculate, self._filenames))
+            )
+        return True
+
+
 class MakeCheckSumReportTask(speedwagon.tasks.Subtask[None]):
     """Generate a checksum report.
 
@@ -101,6 +227,33 @@ ValidateImageMetadataResult = TypedDict(
 )
 
 
+def validate_image_metadata(
+    filename: str, profile_name: str
+) -> ValidateImageMetadataResult:
+    """Validate the metadata of an image file against a profile.
+
+    Args:
+        filename: path to file
+        profile_name: Name of the validation profile to use.
+
+    Returns:
+        Validation result for the file.
+    """
+    profile_validator = get_profile_validator(profile_name)
+    try:
+        report = profile_validator.validate(filename)
+        is_valid = report.valid
+        report_text = "\n* ".join(report.issues())
+    except RuntimeError as error:
+        is_valid = False
+        report_text = str(error)
+    return {
+        "filename": filename,
+        "valid": is_valid,
+        "report": f"* {report_text}",
+    }
+
+
 class ValidateImageMetadataTask(
     speedwagon.tasks.Subtask[ValidateImageMetadataResult]
 ):
@@ -117,7 +270,7 @@ class ValidateImageMetadataTask(
         """
         super().__init__()
         self._filename = filename
-        self._profile = imagevalidate.get_profile(profile_name)
+        self._profile_name = profile_name
 
     def task_description(self) -> Optional[str]:
         """Get user readable information about what the subtask is doing."""
@@ -126,24 +279,45 @@ class ValidateImageMetadataTask(
     def work(self) -> bool:
         """Validate file."""
         self.log(f"Validating {self._filename}")
+        result = validate_image_metadata(self._filename, self._profile_name)
+        self.log(f"Validating {self._filename} -- {result['valid']}")
+        self.set_results(result)
+        return True
+
+
+class ValidateImageMetadataBatchTask(
+    speedwagon.tasks.Subtask[List[ValidateImageMetadataResult]]
+):
+    """Validate the metadata of a group of image files."""
 
-        profile_validator = imagevalidate.Profile(self._profile)
+    name = "Validate Images Metadata"
 
-        try:
-            report = profile_validator.validate(self._filename)
-            is_valid = report.valid
-            report_text = "\n* ".join(report.issues())
-        except RuntimeError as error:
-            is_valid = False
-            report_text = str(error)
-        self.log(f"Validating {self._filename} -- {is_valid}")
+    def __init__(self, filenames: List[str], profile_name: str) -> None:
+        """Create an image validation batch subtask.
 
+        Args:
+            filenames: paths to files
+            profile_name: Name of the validation profile to use.
+        """
+        super().__init__()
+        self._filenames = filenames
+        self._profile_name = profile_name
+
+    def task_description(self) -> Optional[str]:
+        """Get user readable information about what the subtask is doing."""
+        return f"Validating image metadata for {len(self._filenames)} file(s)"
+
+    def _validate(self, filename: str) -> ValidateImageMetadataResult:
+        result = validate_image_metadata(filename, self._profile_name)
+        self.log(f"Validating {filename} -- {result['valid']}")
+        return result
+
+    def work(self) -> bool:
+        """Validate every file in the batch."""
+        # The files are validated one after another. The exiv2 binding used
+        # to read the metadata is not known to be safe to use from several
+        # threads at once.
         self.set_results(
-            {
-                "filename": self._filename,
-                "valid": is_valid,
-                "report": f"* {report_text}",
-            }
+            [self._validate(filename) for filename in self._filenames]
         )
-
         return True
@@ -1,11 +1,12 @@
 """Generating MARC XML files by retrieving from a server."""
 from __future__ import annotations
 import abc
+import bisect
+import concurrent.futures
 import functools
 import os
 import re
 import typing
-from copy import deepcopy
 
 from typing import (
     List,
@@ -27,6 +28,7 @@ from xml.dom import minidom
 import xml.etree.ElementTree as ET
 import traceback
 import sys
+import lxml.etree as LET
 import requests
 
 import speedwagon
@@ -85,6 +87,31 @@ MMSID_PATTERN = re.compile(
 BIBID_PATTERN = re.compile(r"^(?P<identifier>[0-9]*)")
 
 MARC21_NAMESPACE = "http://www.loc.gov/MARC21/slim"
+_DATAFIELD_TAG = f"{{{MARC21_NAMESPACE}}}datafield"
+_SUBFIELD_TAG = f"{{{MARC21_NAMESPACE}}}subfield"
+
+
+def _parse_bibid(value: str) -> Optional[Tuple[str, Optional[str]]]:
+    # Most bibid folders are only digits so the regex is not needed
+    if value.isdigit():
+        return value, None
+    match = BIBID_PATTERN.match(value)
+    return None if match is None else (match.group("identifier"), None)
+
+
+def _parse_mmsid(value: str) -> Optional[Tuple[str, Optional[str]]]:
+    match = MMSID_PATTERN.match(value)
+    if match is None:
+        return None
+    return match.group("identifier"), match.group("volume")
+
+
+_IDENTIFIER_PARSERS: Dict[
+    str, Callable[[str], Optional[Tuple[str, Optional[str]]]]
+] = {
+    "MMS ID": _parse_mmsid,
+    "Bibid": _parse_bibid,
+}
 
 
 class RecordNotFound(SpeedwagonException):
@@ -98,7 +125,7 @@ JobArgs = typing.TypedDict(
         "directory": DirectoryType,
         "api_server": str,
         "path": str,
-        "enhancements": Dict[str, bool]
+        "record": Optional[str],
     }
 )
 
@@ -113,6 +140,12 @@ UserArgs = typing.TypedDict(
 )
 GETMARC_SERVER_URL_CONFIG = "Getmarc server url"
 
+FILTER_FOLDER_WORKERS = 32
+FETCH_RECORD_WORKERS = 8
+
+# Size of the pieces an existing MARC file is compared in before writing
+COMPARE_CHUNK_SIZE = 16 * 1024
+
 
 class GenerateMarcXMLFilesWorkflow(speedwagon.Workflow[UserArgs]):
     """Generate Marc XML files.
@@ -239,10 +272,83 @@ class GenerateMarcXMLFilesWorkflow(speedwagon.Workflow[UserArgs]):
             self.get_workflow_configuration_value(GETMARC_SERVER_URL_CONFIG),
         )
 
+    def _require_marc_server(self) -> str:
+        server_url = self.get_marc_server()
+        if server_url is None:
+            raise MissingConfiguration(
+                workflow=self.name,
+                key=GETMARC_SERVER_URL_CONFIG
+            )
+        return server_url
+
+    def locate_bib_id_folders(
+        self, search_path: str
+    ) -> List[os.DirEntry[str]]:
+        """Locate the folders named with an identifier.
+
+        Args:
+            search_path: Path to the folder containing the items.
+
+        Returns:
+            Returns the folders that are named with an identifier.
+
+        """
+        try:
+            # Checking each entry can mean a round trip to the file server
+            # when the input is on a network share, so check them all at
+            # once.
+            entries = list(os.scandir(search_path))
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=FILTER_FOLDER_WORKERS
+            ) as executor:
+                is_bib_id_folder = list(
+                    executor.map(self.filter_bib_id_folders, entries)
+                )
+        except BadNamingError as error:
+            raise JobCancelled(
+                f"Unable to locate marc record due to invalid naming "
+                f"convention. {error.path}"
+            ) from error
+        return [
+            entry for entry, keep in zip(entries, is_bib_id_folder) if keep
+        ]
+
+    def initial_task(
+        self,
+        task_builder: "speedwagon.tasks.TaskBuilder",
+        user_args: UserArgs
+    ) -> None:
+        """Retrieve all the MARC records up front in a single batch.
+
+        The folders located here are passed on to discover_task_metadata
+        with the results, so the input is only searched once.
+
+        Args:
+            task_builder: task builder object provided by speedwagon runtime
+            user_args: User selected options
+
+        """
+        server_url = self._require_marc_server()
+        identifier_type = user_args["Identifier type"]
+        task_builder.add_subtask(
+            MarcBatchFetchTask(
+                folders={
+                    folder.path: self._parse_identifier(
+                        folder.name, identifier_type
+                    )[0]
+                    for folder in self.locate_bib_id_folders(
+                        user_args["Input"]
+                    )
+                },
+                identifier_type=identifier_type,
+                server_url=server_url,
+            )
+        )
+
     def discover_task_metadata(
         self,
-        initial_results: Sequence[  # pylint: disable=unused-argument
-            speedwagon.tasks.Result[Never]
+        initial_results: Sequence[
+            speedwagon.tasks.Result[Dict[str, Optional[str]]]
         ],
         additional_data: Mapping[str, Never],  # pylint: disable=W0613
         user_args: UserArgs
@@ -250,7 +356,8 @@ class GenerateMarcXMLFilesWorkflow(speedwagon.Workflow[UserArgs]):
         """Create a list of metadata that the jobs will need in order to work.
 
         Args:
-            initial_results: Not used here
+            initial_results: MARC records already retrieved for each folder
+                located. If empty, the folders are located here instead.
             additional_data: Not used here
             **user_args:  User defined settings.
 
@@ -258,37 +365,28 @@ class GenerateMarcXMLFilesWorkflow(speedwagon.Workflow[UserArgs]):
             list of dictionaries of job metadata
 
         """
-        server_url = self.get_marc_server()
-        if server_url is None:
-            raise MissingConfiguration(
-                workflow=self.name,
-                key=GETMARC_SERVER_URL_CONFIG
-            )
-
+        server_url = self._require_marc_server()
         search_path = user_args["Input"]
-        try:
-            jobs: List[JobArgs] = [
-                {
-                    "directory": {
-                        "value": folder.name,
-                        "type": user_args["Identifier type"],
-                    },
-                    "enhancements": {
-                        "955": user_args.get("Add 955 field", False),
-                        "035": user_args.get("Add 035 field", False),
-                    },
-                    "api_server": server_url,
-                    "path": folder.path,
-                }
-                for folder in filter(
-                    self.filter_bib_id_folders, os.scandir(search_path)
-                )
-            ]
-        except BadNamingError as error:
-            raise JobCancelled(
-                f"Unable to locate marc record due to invalid naming "
-                f"convention. {error.path}"
-            ) from error
+        records: Dict[str, Optional[str]] = {}
+        for result in initial_results:
+            records.update(result.data)
+        if not initial_results:
+            records = {
+                folder.path: None
+                for folder in self.locate_bib_id_folders(search_path)
+            }
+        jobs: List[JobArgs] = [
+            {
+                "directory": {
+                    "value": os.path.basename(path),
+                    "type": user_args["Identifier type"],
+                },
+                "api_server": server_url,
+                "path": path,
+                "record": record,
+            }
+            for path, record in records.items()
+        ]
         if not jobs:
             raise JobCancelled(
                 f"No directories containing packages located inside "
@@ -315,7 +413,6 @@ class GenerateMarcXMLFilesWorkflow(speedwagon.Workflow[UserArgs]):
         if not isinstance(directory, dict):
             raise TypeError()
         identifier_type = str(directory["type"])
-        subdirectory = str(directory["value"])
         identifier, _ = self._get_identifier_volume(_job_args)
 
         folder = str(_job_args["path"])
@@ -326,24 +423,41 @@ class GenerateMarcXMLFilesWorkflow(speedwagon.Workflow[UserArgs]):
                 identifier_type=identifier_type,
                 output_name=marc_file,
                 server_url=str(_job_args["api_server"]),
+                record=_job_args.get("record"),
             )
         )
-        enhancements = _job_args.get("enhancements", {})
-        if not isinstance(enhancements, dict):
-            raise TypeError()
 
-        add_955 = enhancements.get("955", False)
-        if add_955:
-            task_builder.add_subtask(
-                MarcEnhancement955Task(
-                    added_value=subdirectory, xml_file=marc_file
-                )
-            )
-        add_035 = enhancements.get("035")
-        if add_035:
-            task_builder.add_subtask(
-                MarcEnhancement035Task(xml_file=marc_file)
+    def completion_task(
+        self,
+        task_builder: "speedwagon.tasks.TaskBuilder",
+        results: List[speedwagon.tasks.Result[MarcGeneratorTaskReport]],
+        user_args: UserArgs
+    ) -> None:
+        """Enhance all the retrieved MARC files at the end in one batch.
+
+        Args:
+            task_builder: task builder
+            results: results of the MARC file retrieval tasks
+            user_args: user defined settings
+
+        """
+        enhancements = {
+            "955": user_args.get(OPTION_955_FIELD, False),
+            "035": user_args.get(OPTION_035_FIELD, False),
+        }
+        if not any(enhancements.values()):
+            return
+        files: List[EnhancementJob] = [
+            (
+                result.data["output"],
+                os.path.basename(os.path.dirname(result.data["output"])),
+                enhancements,
             )
+            for result in results
+            if result.data["success"] is True
+        ]
+        if files:
+            task_builder.add_subtask(MarcEnhancementBatchTask(files))
 
     @classmethod
     @reports.add_report_borders
@@ -389,24 +503,26 @@ class GenerateMarcXMLFilesWorkflow(speedwagon.Workflow[UserArgs]):
         job_args: JobArgs,
     ) -> Tuple[str, Union[str, None]]:
         directory = job_args["directory"]
-        subdirectory = directory["value"]
-        regex_patterns: Dict[str, re.Pattern[str]] = {
-            "MMS ID": MMSID_PATTERN,
-            "Bibid": BIBID_PATTERN,
-        }
-        regex_pattern = regex_patterns.get(directory["type"])
-        if regex_pattern is None:
+        return GenerateMarcXMLFilesWorkflow._parse_identifier(
+            directory["value"], directory["type"]
+        )
+
+    @staticmethod
+    def _parse_identifier(
+        subdirectory: str, identifier_type: str
+    ) -> Tuple[str, Union[str, None]]:
+        parser = _IDENTIFIER_PARSERS.get(identifier_type)
+        if parser is None:
             raise SpeedwagonException(
-                f"No identifier pattern for {directory['type']}"
+                f"No identifier pattern for {identifier_type}"
             )
-        match = regex_pattern.match(subdirectory)
-        if match is None:
+        result = parser(subdirectory)
+        if result is None:
             raise SpeedwagonException(
                 f"Directory does not match expected format for "
-                f"{directory['type']}: {subdirectory}"
+                f"{identifier_type}: {subdirectory}"
             )
-        results = match.groupdict()
-        return results["identifier"], results.get("volume")
+        return result
 
     def workflow_options(self) -> List[AbsOutputOptionDataType[str]]:
         """Set the settings for get marc workflow.
@@ -521,6 +637,7 @@ class MarcGeneratorTask(speedwagon.tasks.Subtask[MarcGeneratorTaskReport]):
         identifier_type: str,
         output_name: str,
         server_url: str,
+        record: Optional[str] = None,
     ) -> None:
         """Task for retrieving the data from the server and saving as a file.
 
@@ -529,12 +646,15 @@ class MarcGeneratorTask(speedwagon.tasks.Subtask[MarcGeneratorTaskReport]):
             identifier_type: type of identifier used
             output_name: file name to save the data to
             server_url: getmarc server url
+            record: record already retrieved from the server. If None, the
+                record is retrieved by this task.
         """
         super().__init__()
         self._identifier = identifier
         self._identifier_type = identifier_type
         self._output_name = output_name
         self._server_url = server_url
+        self._record = record
 
     def task_description(self) -> Optional[str]:
         return f"Retrieving MARC record for {self._identifier}"
@@ -553,7 +673,7 @@ class MarcGeneratorTask(speedwagon.tasks.Subtask[MarcGeneratorTaskReport]):
         return self._identifier
 
     @staticmethod
-    def reflow_xml(data: str) -> str:
+    def reflow_xml(data: str) -> bytes:
         """Redraw the xml data to make it more human readable.
 
         This includes adding newline characters
@@ -562,10 +682,14 @@ class MarcGeneratorTask(speedwagon.tasks.Subtask[MarcGeneratorTaskReport]):
             data: xml data as a string
 
         Returns:
-            str: Reformatted xml data.
+            bytes: Reformatted xml data, encoded as UTF-8.
 
         """
-        return minidom.parseString(data).toprettyxml()
+        parser = LET.XMLParser(remove_blank_text=True, encoding="utf-8")
+        root = LET.fromstring(data.encode("utf-8"), parser)
+        return LET.tostring(
+            root, pretty_print=True, xml_declaration=True, encoding="UTF-8"
+        )
 
     def work(self) -> bool:
         """Run the task.
@@ -577,12 +701,13 @@ class MarcGeneratorTask(speedwagon.tasks.Subtask[MarcGeneratorTaskReport]):
             Connection errors to the getmarc server will throw a
                 SpeedwagonException.
         """
-        strategy = SUPPORTED_IDENTIFIERS[self._identifier_type](
-            self._server_url
-        )
         try:
             self.log(f"Accessing MARC record for {self._identifier}")
-            record = strategy.get_record(self._identifier)
+            record = self._record
+            if record is None:
+                record = SUPPORTED_IDENTIFIERS[self._identifier_type](
+                    self._server_url
+                ).get_record(self._identifier)
             pretty_xml = self.reflow_xml(record)
             self.write_file(data=pretty_xml)
 
@@ -595,7 +720,7 @@ class MarcGeneratorTask(speedwagon.tasks.Subtask[MarcGeneratorTaskReport]):
                 }
             )
             return True
-        except UnicodeError as error:
+        except (UnicodeError, LET.XMLSyntaxError) as error:
             raise SpeedwagonException(
                 f"Error with {self._identifier}"
             ) from error
@@ -617,20 +742,110 @@ class MarcGeneratorTask(speedwagon.tasks.Subtask[MarcGeneratorTaskReport]):
                 "Trouble connecting to server getmarc"
             ) from exception
 
-    def write_file(self, data: str) -> None:
+    def write_file(self, data: Union[str, bytes]) -> None:
         """Write the data to a file.
 
+        The file is left untouched if it already contains the same data.
+
         Args:
-            data: Raw string data to save
+            data: Raw data to save. Strings are encoded as UTF-8.
 
         """
         try:
-            with open(self._output_name, "w", encoding="utf-8") as write_file:
-                write_file.write(data)
+            content = data.encode("utf-8") if isinstance(data, str) else data
+            if self._file_matches(content):
+                return
+            with open(self._output_name, "wb") as write_file:
+                write_file.write(content)
         except UnicodeError as error:
             traceback.print_exc(file=sys.stderr)
             raise SpeedwagonException from error
 
+    def _file_matches(self, content: bytes) -> bool:
+        # A file of a different size is never read. A changed record often
+        # has the same size, since only the fixed length 005 field near the
+        # top differs, so the file is compared a chunk at a time and the
+        # rest is not read once a difference is found.
+        try:
+            if os.path.getsize(self._output_name) != len(content):
+                return False
+            view = memoryview(content)
+            with open(self._output_name, "rb") as existing_file:
+                for offset in range(0, len(content), COMPARE_CHUNK_SIZE):
+                    chunk = existing_file.read(COMPARE_CHUNK_SIZE)
+                    if chunk != view[offset:offset + COMPARE_CHUNK_SIZE]:
+                        return False
+            return True
+        except OSError:
+            return False
+
+
+class MarcBatchFetchTask(
+    speedwagon.tasks.Subtask[Dict[str, Optional[str]]]
+):
+    """Retrieve many MARC records from the server concurrently."""
+
+    name = "Retrieve MARC Records"
+
+    def __init__(
+        self,
+        folders: Dict[str, str],
+        identifier_type: str,
+        server_url: str,
+    ) -> None:
+        """Create a task for retrieving records for all the folders.
+
+        Args:
+            folders: id of the record for each folder path
+            identifier_type: type of identifier used
+            server_url: getmarc server url
+        """
+        super().__init__()
+        self.folders = folders
+        self.identifiers = sorted(set(folders.values()))
+        self.identifier_type = identifier_type
+        self.server_url = server_url
+
+    def task_description(self) -> Optional[str]:
+        return f"Retrieving {len(self.identifiers)} MARC record(s)"
+
+    def _fetch(self, identifier: str) -> Optional[str]:
+        strategy = SUPPORTED_IDENTIFIERS[self.identifier_type](
+            self.server_url
+        )
+        try:
+            return strategy.get_record(identifier)
+        except Exception:  # pylint: disable=broad-except
+            # Left for the MarcGeneratorTask of that folder to retry and
+            # report.
+            return None
+
+    def work(self) -> bool:
+        """Retrieve the records.
+
+        The results map each folder path to its record, or to None if the
+        record could not be retrieved.
+
+        Returns:
+            bool: True on success, False otherwise.
+        """
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=FETCH_RECORD_WORKERS
+        ) as executor:
+            records = dict(
+                zip(
+                    self.identifiers,
+                    executor.map(self._fetch, self.identifiers)
+                )
+            )
+        self.set_results(
+            {
+                path: records[identifier]
+                for path, identifier in self.folders.items()
+            }
+        )
+        return True
+
 
 class EnhancementTask(speedwagon.tasks.Subtask[None]):
     """Base class for enhancing xml file."""
@@ -665,7 +880,47 @@ class EnhancementTask(speedwagon.tasks.Subtask[None]):
     def redraw_tree(
         tree: ET.ElementTree, *new_datafields: ET.Element
     ) -> ET.Element:
-        """Redraw the tree so that everything is in order."""
+        """Redraw the tree so that everything is in order.
+
+        New datafields go before any existing datafields with the same tag,
+        in the order given. When the existing datafields are already sorted
+        by tag, each new datafield is spliced in at its position without
+        touching its siblings. Otherwise every datafield is sorted again.
+        """
+        root = tree.getroot()
+        positions: List[int] = []
+        # Sort keys of the datafields. Existing datafields sort after new
+        # ones with the same tag.
+        keys: List[Tuple[int, int]] = []
+        for index, child in enumerate(root):
+            if child.tag == _DATAFIELD_TAG:
+                positions.append(index)
+                keys.append((int(child.attrib["tag"]), 1))
+
+        if any(key > next_key for key, next_key in zip(keys, keys[1:])):
+            return EnhancementTask._sort_datafields(tree, *new_datafields)
+
+        for new_datafield in new_datafields:
+            key = (int(new_datafield.attrib["tag"]), 0)
+            location = bisect.bisect_right(keys, key)
+            if location < len(positions):
+                position = positions[location]
+            else:
+                # After the last datafield, ahead of anything that follows
+                # the datafields.
+                position = positions[-1] + 1 if positions else len(root)
+            root.insert(position, new_datafield)
+            positions[location:] = [
+                existing + 1 for existing in positions[location:]
+            ]
+            positions.insert(location, position)
+            keys.insert(location, key)
+        return root
+
+    @staticmethod
+    def _sort_datafields(
+        tree: ET.ElementTree, *new_datafields: ET.Element
+    ) -> ET.Element:
         root = tree.getroot()
         namespaces = {"marc": MARC21_NAMESPACE}
         fields = list(new_datafields)
@@ -677,6 +932,39 @@ class EnhancementTask(speedwagon.tasks.Subtask[None]):
         return root
 
 
+# xml file, value for the 955 field, enhancements to apply
+EnhancementJob = Tuple[str, str, Dict[str, bool]]
+
+
+class MarcEnhancementBatchTask(speedwagon.tasks.Subtask[None]):
+    """Apply the requested enhancements to a batch of MARC xml files."""
+
+    name = "Enhance MARC Files"
+
+    def __init__(self, files: List[EnhancementJob]) -> None:
+        """Create a new task for enhancing a batch of xml files.
+
+        Args:
+            files: xml files with the 955 value and enhancements for each.
+
+        """
+        super().__init__()
+        self.files = files
+
+    def task_description(self) -> Optional[str]:
+        return f"Enhancing {len(self.files)} MARC file(s)"
+
+    def work(self) -> bool:
+        """Enhance every file.
+
+        Returns:
+            Returns True if all files were enhanced, else returns False
+
+        """
+        # Every file is enhanced even if an earlier one fails
+        return all([_enhance_file(job) for job in self.files])
+
+
 _T = typing.TypeVar("_T")
 # pylint: disable=typevar-name-incorrect-variance
 # pylint: disable=invalid-name
@@ -756,16 +1044,14 @@ class MarcEnhancement035Task(EnhancementTask):
 
         """
         new_datafield = ET.Element(
-            "{http://www.loc.gov/MARC21/slim}datafield",
-            attrib={"tag": "035", "ind1": " ", "ind2": " "},
+            _DATAFIELD_TAG, attrib={"tag": "035", "ind1": " ", "ind2": " "}
         )
-        new_subfield = deepcopy(data)
-        if new_subfield.text is not None:
-            new_subfield.text = new_subfield.text.replace(
-                "(UIUdb)", "(UIU)Voyager"
-            )
-
-        new_datafield.append(new_subfield)
+        new_subfield = ET.SubElement(
+            new_datafield, data.tag, attrib=dict(data.attrib)
+        )
+        if data.text is not None:
+            new_subfield.text = data.text.replace("(UIUdb)", "(UIU)Voyager")
+        new_subfield.tail = data.tail
         return new_datafield
 
     @provide_info
@@ -852,13 +1138,21 @@ class MarcEnhancement955Task(EnhancementTask):
 
         """
         new_datafield = ET.Element(
-            "{http://www.loc.gov/MARC21/slim}datafield",
-            attrib={"tag": "955", "ind1": " ", "ind2": " "},
+            _DATAFIELD_TAG, attrib={"tag": "955", "ind1": " ", "ind2": " "}
         )
-        new_subfield = ET.Element(
-            "{http://www.loc.gov/MARC21/slim}subfield",
-            attrib={"code": "b"},
+        new_subfield = ET.SubElement(
+            new_datafield, _SUBFIELD_TAG, attrib={"code": "b"}
         )
         new_subfield.text = added_value
-        new_datafield.append(new_subfield)
         return new_datafield
+
+
+def _enhance_file(job: EnhancementJob) -> bool:
+    xml_file, added_value, enhancements = job
+    if enhancements.get("955", False) and not MarcEnhancement955Task(
+        added_value=added_value, xml_file=xml_file
+    ).work():
+        return False
+    if enhancements.get("035", False):
+        return MarcEnhancement035Task(xml_file=xml_file).work()
+    return True
@@ -1,7 +1,9 @@
 """Workflow to convert hathi limited packages to digital library format."""
 from __future__ import annotations
 
+import concurrent.futures
 import logging
+import os
 import typing
 from typing import List, Optional, Mapping
 
@@ -11,8 +13,9 @@ import uiucprescon.packager.packages.collection
 import speedwagon
 import speedwagon.workflow
 from speedwagon.job import Workflow
-from speedwagon import reports, utils
+from speedwagon import reports
 from speedwagon import validators
+from speedwagon_uiucprescon import task_logging
 
 if typing.TYPE_CHECKING:
     import sys
@@ -42,11 +45,33 @@ UserOptions = typing.TypedDict(
 JobArgs = typing.TypedDict(
     "JobArgs",
     {
-        "package": uiucprescon.packager.packages.collection.Package,
+        "packages": List[uiucprescon.packager.packages.collection.Package],
         "destination": str
     }
 )
 
+# Number of packages converted together by a single task
+CONVERSION_BATCH_SIZE = 8
+
+_HATHI_LIMITED_VIEW_FACTORY = packager.PackageFactory(
+    packager.packages.HathiLimitedView()
+)
+_DL_COMPOUND_FACTORY = packager.PackageFactory(
+    packager.packages.DigitalLibraryCompound()
+)
+
+_PACKAGER_LOGGER = logging.getLogger(packager.__name__)
+
+
+def _output_is_not_input(
+    candidate: str, job_args: Mapping[str, object]
+) -> bool:
+    return candidate != job_args['Input']
+
+
+def _output_is_input_message(_: str) -> str:
+    return "Input cannot be the same as Output"
+
 
 class HathiLimitedToDLWorkflow(Workflow[UserOptions]):
     """Converts Hathi Limited View file packages to Digital Library format."""
@@ -68,25 +93,25 @@ class HathiLimitedToDLWorkflow(Workflow[UserOptions]):
         ],
         user_args: UserOptions
     ) -> List[JobArgs]:
-        """Find file packages."""
-        hathi_limited_view_packager = packager.PackageFactory(
-            packager.packages.HathiLimitedView())
-
+        """Find file packages and group them into batches."""
+        packages = list(
+            _HATHI_LIMITED_VIEW_FACTORY.locate_packages(user_args['Input'])
+        )
+        destination = user_args['Output']
         return [{
-            "package": package,
-            "destination": user_args['Output']
-        } for package in hathi_limited_view_packager.locate_packages(
-            user_args['Input'])]
+            "packages": packages[index:index + CONVERSION_BATCH_SIZE],
+            "destination": destination
+        } for index in range(0, len(packages), CONVERSION_BATCH_SIZE)]
 
     def create_new_task(
         self,
         task_builder: "speedwagon.tasks.TaskBuilder",
         job_args: JobArgs
     ) -> None:
-        """Create a task for converting a package."""
+        """Create a task for converting a batch of packages."""
         task_builder.add_subtask(
-            PackageConverter(src=job_args['package'],
-                             dst=job_args['destination'])
+            BatchedPackageConverter(srcs=job_args['packages'],
+                                    dst=job_args['destination'])
         )
 
     def job_options(
@@ -106,13 +131,8 @@ class HathiLimitedToDLWorkflow(Workflow[UserOptions]):
         output_value = speedwagon.workflow.DirectorySelect("Output")
         output_value.add_validation(
             validators.CustomValidation[str](
-                query=(
-                    lambda candidate, job_args: candidate != job_args['Input']
-                ),
-                failure_message_function=(
-                    lambda _: "Input cannot be the same as Output"
-                )
-
+                query=_output_is_not_input,
+                failure_message_function=_output_is_input_message
             )
         )
         output_value.add_validation(
@@ -127,44 +147,53 @@ class HathiLimitedToDLWorkflow(Workflow[UserOptions]):
     @reports.add_report_borders
     def generate_report(
         cls,
-        results: List[speedwagon.tasks.Result[PackageConverterReport]],
+        results: List[
+            speedwagon.tasks.Result[List[PackageConverterReport]]
+        ],
         user_args: UserOptions
     ) -> Optional[str]:
         """Generate a report of packages converted."""
-        total = len(results)
+        total = sum(len(result.data) for result in results)
 
         return f"""All done. Converted {total} packages.
  Results located at {user_args['Output']}
 """
 
 
-class PackageConverter(speedwagon.tasks.Subtask[PackageConverterReport]):
-    name = "Convert Package"
+class BatchedPackageConverter(
+    speedwagon.tasks.Subtask[List[PackageConverterReport]]
+):
+    name = "Convert Packages"
 
     def __init__(
             self,
-            src: uiucprescon.packager.packages.collection.Package,
+            srcs: List[uiucprescon.packager.packages.collection.Package],
             dst: str
     ) -> None:
         super().__init__()
-        self.src = src
+        self.srcs = srcs
         self.dst = dst
-        self.output_packager = packager.PackageFactory(
-            packager.packages.DigitalLibraryCompound())
+        self.output_packager = _DL_COMPOUND_FACTORY
 
     def task_description(self) -> Optional[str]:
-        return f"Converting package {self.src}"
+        return f"Converting {len(self.srcs)} package(s)"
 
-    def work(self) -> bool:
-
-        my_logger = logging.getLogger(packager.__name__)
-        my_logger.setLevel(logging.INFO)
+    def _convert(
+        self,
+        src: uiucprescon.packager.packages.collection.Package
+    ) -> PackageConverterReport:
+        with task_logging.thread_log_config(_PACKAGER_LOGGER, self.log):
+            self.log(f"Converting package from {src}")
+            self.output_packager.transform(src, self.dst)
+        return {"destination": self.dst}
 
-        with utils.log_config(my_logger, self.log):
-            self.log(f"Converting package from {self.src}")
-            self.output_packager.transform(self.src, self.dst)
-            self.set_results({
-                "destination": self.dst
-            })
+    def work(self) -> bool:
+        with task_logging.logger_level(_PACKAGER_LOGGER, logging.INFO):
+            # Converting is mostly file I/O so the packages in the batch
+            # are converted at the same time.
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(CONVERSION_BATCH_SIZE, os.cpu_count() or 1)
+            ) as executor:
+                self.set_results(list(executor.map(self._convert, self.srcs)))
 
         return True
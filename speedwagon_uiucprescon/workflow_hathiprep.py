@@ -1,9 +1,11 @@
 """Hathi Prep Workflow."""
 from __future__ import annotations
 
-import itertools
+import functools
 import os
-from typing import List, Sequence, Dict, Optional, Union, Mapping, TypedDict
+from typing import (
+    List, Sequence, Dict, Optional, Union, Mapping, TypedDict, Set
+)
 
 import typing
 
@@ -40,6 +42,18 @@ JobArgs = TypedDict(
 )
 
 
+# Image file types the user can select from, in the order they are listed.
+_PACKAGE_TYPES = {
+    "JPEG 2000": HathiJp2,
+    "TIFF": HathiTiff,
+}
+
+
+@functools.lru_cache(maxsize=len(_PACKAGE_TYPES))
+def _factory_for(image_type: str) -> PackageFactory:
+    return PackageFactory(_PACKAGE_TYPES[image_type]())
+
+
 TitlePageResults = typing.TypedDict(
     'TitlePageResults',
     {
@@ -53,30 +67,32 @@ def data_gathering_callback(
     pretask_results: List[speedwagon.tasks.Result[List[collection.Package]]]
 ) -> List[Sequence[DataItem]]:
     rows: List[Sequence[DataItem]] = []
+    basename = os.path.basename
     values = pretask_results[0]
     for package in values.data:
+        metadata = package.metadata
         title_page = DataItem(
             name="Title Page",
-            value=typing.cast(str, package.metadata.get(Metadata.TITLE_PAGE))
+            value=typing.cast(str, metadata.get(Metadata.TITLE_PAGE))
         )
         title_page.editable = True
-        files = []
-        for i in package:
-            for instance in i.instantiations.values():
-                files += [os.path.basename(f) for f in instance.files]
-        files.sort()
-        title_page.possible_values = files
+        title_page.possible_values = sorted(
+            basename(file_name)
+            for item in package
+            for instance in item.instantiations.values()
+            for file_name in instance.files
+        )
 
         rows.append(
             (
                 DataItem(
                     name="Object",
-                    value=typing.cast(str, package.metadata[Metadata.ID])
+                    value=typing.cast(str, metadata[Metadata.ID])
                 ),
                 title_page,
                 DataItem(
                     name="Location",
-                    value=typing.cast(str, package.metadata[Metadata.PATH])
+                    value=typing.cast(str, metadata[Metadata.PATH])
                 )
             )
         )
@@ -114,8 +130,8 @@ class HathiPrepWorkflow(speedwagon.Workflow[UserArgs]):
         """
         package_type = speedwagon.workflow.ChoiceSelection("Image File Type")
         package_type.placeholder_text = "Select an Image Format"
-        package_type.add_selection("JPEG 2000")
-        package_type.add_selection("TIFF")
+        for image_type in _PACKAGE_TYPES:
+            package_type.add_selection(image_type)
 
         input_option = speedwagon.workflow.DirectorySelect("input")
         input_option.add_validation(validators.ExistsOnFileSystem())
@@ -162,7 +178,6 @@ class HathiPrepWorkflow(speedwagon.Workflow[UserArgs]):
                 the source path.
 
         """
-        jobs: List[JobArgs] = []
         packages =\
             typing.cast(Sequence[collection.Package], initial_results[0].data)
 
@@ -172,22 +187,20 @@ class HathiPrepWorkflow(speedwagon.Workflow[UserArgs]):
                 additional_data.get('title_pages', {})
             )
 
-        for package in packages:
-            package_identifier =\
-                typing.cast(str, package.metadata[Metadata.ID])
-
-            job: JobArgs = {
-                "package_id": package_identifier,
-                "title_page": package_title_pages.get(package_identifier),
-                "source_path":
-                    typing.cast(
-                        str,
-                        package.metadata[Metadata.PATH]
-                    )
+        package_id_key = Metadata.ID
+        package_path_key = Metadata.PATH
+        get_title_page = package_title_pages.get
+        return [
+            {
+                "package_id": (
+                    package_identifier :=
+                    typing.cast(str, metadata[package_id_key])
+                ),
+                "title_page": get_title_page(package_identifier),
+                "source_path": typing.cast(str, metadata[package_path_key]),
             }
-            jobs.append(job)
-
-        return jobs
+            for metadata in (package.metadata for package in packages)
+        ]
 
     def create_new_task(
         self,
@@ -235,8 +248,8 @@ class HathiPrepWorkflow(speedwagon.Workflow[UserArgs]):
         ) -> TitlePageResults:
             return {
                 "title_pages": {
-                    typing.cast(str, row[0].value): row[1].value
-                    for row in data
+                    typing.cast(str, package_object.value): title_page.value
+                    for package_object, title_page, *_ in data
                 }
             }
 
@@ -271,61 +284,49 @@ class HathiPrepWorkflow(speedwagon.Workflow[UserArgs]):
             Returns a string explaining the prepped objects.
 
         """
-        results_sorted = sorted(results, key=lambda x: x.source.__name__)
-        _result_grouped = itertools.groupby(results_sorted, lambda x: x.source)
-        results_grouped = {k: [i.data for i in v] for k, v in _result_grouped}
-
-        num_checksum_files = len(
-            results_grouped[tasks.GenerateChecksumTask]
-        )
-
-        num_yaml_files = len(
-            results_grouped[tasks.MakeMetaYamlTask]
-        )
-
-        objects = {
-            result['package_id']
-            for result in results_grouped[
-                tasks.GenerateChecksumTask
+        num_checksum_files = 0
+        num_yaml_files = 0
+        objects: Set[str] = set()
+        for result in results:
+            if result.source is tasks.GenerateChecksumTask:
+                num_checksum_files += 1
+            elif result.source is tasks.MakeMetaYamlTask:
+                num_yaml_files += 1
+            else:
+                continue
+            objects.add(result.data['package_id'])
+
+        return "\n".join(
+            [
+                "HathiPrep Report:",
+                "",
+                "Prepped the following objects:",
+                *(f"  {package_id}" for package_id in sorted(objects)),
+                "",
+                "Total files generated:",
+                f"  {num_checksum_files} checksum.md5 files",
+                f"  {num_yaml_files} meta.yml files",
             ]
-        }
-
-        for result in results_grouped[tasks.MakeMetaYamlTask]:
-            objects.add(result['package_id'])
-
-        objects_prepped_list = "\n  ".join(objects)
-
-        return f"HathiPrep Report:" \
-               f"\n" \
-               f"\nPrepped the following objects:" \
-               f"\n  {objects_prepped_list}" \
-               f"\n" \
-               f"\nTotal files generated: " \
-               f"\n  {num_checksum_files} checksum.md5 files" \
-               f"\n  {num_yaml_files} meta.yml files"
+        )
 
 
 class FindHathiPackagesTask(speedwagon.tasks.Subtask[List[typing.Any]]):
-    image_types = {
-        "TIFF": HathiTiff(),
-        "JPEG 2000": HathiJp2()
-    }
-
     def __init__(self, search_path: str, image_type: str) -> None:
         super().__init__()
         self.image_type = image_type
         self.search_path = search_path
 
-    def locate_packages(self) -> Sequence[collection.Package]:
-        package_factory = PackageFactory(self.image_types[self.image_type])
-        return list(package_factory.locate_packages(self.search_path))
+    def locate_packages(self) -> List[collection.Package]:
+        return list(
+            _factory_for(self.image_type).locate_packages(self.search_path)
+        )
 
     @staticmethod
     def _package_sortable_key(package: collection.Package) -> str:
         return typing.cast(str, package.metadata[Metadata.ID])
 
     def work(self) -> bool:
-        self.set_results(
-            sorted(self.locate_packages(), key=self._package_sortable_key)
-        )
+        packages = self.locate_packages()
+        packages.sort(key=self._package_sortable_key)
+        self.set_results(packages)
         return True
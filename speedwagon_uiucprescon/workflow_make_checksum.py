@@ -5,12 +5,11 @@ import typing
 
 import os
 
-import itertools
 import warnings
 from abc import ABC
 from typing import (
-    List, DefaultDict, Optional, TypedDict, Iterable, Any, Mapping, TypeVar,
-    Generic, TYPE_CHECKING
+    List, DefaultDict, Optional, TypedDict, Iterable, Any, Mapping,
+    TypeVar, Generic, TYPE_CHECKING
 )
 
 import speedwagon
@@ -19,7 +18,7 @@ import speedwagon.workflow
 from speedwagon.reports import add_report_borders
 from speedwagon import validators
 
-from speedwagon_uiucprescon import tasks
+from speedwagon_uiucprescon import tasks, filesystem
 
 if TYPE_CHECKING:
     import sys
@@ -35,22 +34,93 @@ __all__ = [
     'RegenerateChecksumBatchMultipleWorkflow'
 ]
 
-DEFAULT_CHECKSUM_FILE_NAME = "checksum.md5"
+DEFAULT_CHECKSUM_ALGORITHM = "md5"
+DEFAULT_CHECKSUM_FILE_NAME = f"checksum.{DEFAULT_CHECKSUM_ALGORITHM}"
+
+# Maximum number of files hashed by a single task
+CHECKSUM_BATCH_SIZE = 64
 
 UserArgs = TypedDict("UserArgs", {
     "Input": str
 })
 
+MakeChecksumUserArgs = TypedDict("MakeChecksumUserArgs", {
+    "Input": str,
+    "Algorithm": str
+})
+
+MakeChecksumBatchTaskArgs = TypedDict("MakeChecksumBatchTaskArgs", {
+    "source_path": str,
+    "filenames": List[str],
+    "save_to_filename": str,
+    "algorithm": str
+})
+
+
+def checksum_file_name(algorithm: str) -> str:
+    """Get the name of the checksum report for a hash algorithm."""
+    return f"checksum.{algorithm}"
+
+
+def _algorithm_option() -> speedwagon.workflow.ChoiceSelection:
+    algorithm = speedwagon.workflow.ChoiceSelection("Algorithm")
+    for algorithm_name in tasks.validation.CHECKSUM_ALGORITHMS:
+        algorithm.add_selection(algorithm_name)
+    algorithm.value = DEFAULT_CHECKSUM_ALGORITHM
+    return algorithm
+
+
 _T = TypeVar("_T", bound=Mapping[str, object])
 _RT = TypeVar("_RT", bound=Mapping[str, object])
 
 
 class CreateChecksumWorkflow(Generic[_T, _RT], Workflow[_T], ABC):
     @staticmethod
-    def locate_files(package_root: str) -> Iterable[str]:
-        for root, _, files in os.walk(package_root):
-            for file_ in files:
-                yield os.path.join(root, file_)
+    def locate_files(package_root: str) -> Iterable[os.DirEntry[str]]:
+        """Locate every file in a package.
+
+        The entries keep the file information read while searching, so
+        checking them again does not need another stat call.
+        """
+        return filesystem.walk_files(
+            package_root, include_file=lambda entry: entry.is_file()
+        )
+
+    @classmethod
+    def locate_relative_files(cls, package_root: str) -> List[str]:
+        """Locate every file in a package, relative to the package root."""
+        # Every path found starts with the package root so slicing it off
+        # gives the same result as os.path.relpath for a fraction of the
+        # work.
+        prefix_length = len(os.path.join(package_root, ""))
+        return [
+            entry.path[prefix_length:]
+            for entry in cls.locate_files(package_root)
+        ]
+
+    @staticmethod
+    def batch_files(
+        source_path: str,
+        filenames: List[str],
+        save_to_filename: str,
+        algorithm: str = DEFAULT_CHECKSUM_ALGORITHM
+    ) -> List[MakeChecksumBatchTaskArgs]:
+        """Split the files of a checksum report into batches of jobs."""
+        return [{
+            "source_path": source_path,
+            "filenames": filenames[index:index + CHECKSUM_BATCH_SIZE],
+            "save_to_filename": save_to_filename,
+            "algorithm": algorithm
+        } for index in range(0, len(filenames), CHECKSUM_BATCH_SIZE)]
+
+    @staticmethod
+    def flatten_results(
+        results: List[
+            speedwagon.tasks.Result[List[tasks.MakeChecksumResult]]
+        ]
+    ) -> List[tasks.MakeChecksumResult]:
+        """Combine the checksums calculated by every batch task."""
+        return [checksum for result in results for checksum in result.data]
 
     @classmethod
     def sort_results(
@@ -62,29 +132,25 @@ class CreateChecksumWorkflow(Generic[_T, _RT], Workflow[_T], ABC):
             List[tasks.MakeChecksumResult]
         ] = collections.defaultdict(list)
 
-        def sort_func(value: tasks.MakeChecksumResult) -> str:
-            return value['checksum_file']
+        for result_data in results:
+            new_results[result_data['checksum_file']].append(result_data)
 
-        sorted_results = sorted(results, key=sort_func)
-
-        for key, value in itertools.groupby(sorted_results, key=sort_func):
-
-            for result_data in value:
-                new_results[key].append(result_data)
-        return dict(new_results)
+        # Only the report names are sorted, the results for each report
+        # stay in the order they were calculated.
+        return dict(sorted(new_results.items()))
 
     def completion_task(
         self,
         task_builder: "speedwagon.tasks.TaskBuilder",
         results: List[
             speedwagon.tasks.Result[
-                tasks.MakeChecksumResult
+                List[tasks.MakeChecksumResult]
             ]
         ],
         user_args: _T  # pylint: disable=unused-argument
     ) -> None:
         """Create checksum report at very end."""
-        sorted_results = self.sort_results([i.data for i in results])
+        sorted_results = self.sort_results(self.flatten_results(results))
 
         for checksum_report, checksums in sorted_results.items():
 
@@ -96,7 +162,7 @@ class CreateChecksumWorkflow(Generic[_T, _RT], Workflow[_T], ABC):
     def create_new_task(
         self,
         task_builder: speedwagon.tasks.TaskBuilder,
-        job_args: MakeChecksumBatchMultipleTaskArgs
+        job_args: MakeChecksumTaskArgs
     ) -> None:
 
         filename = job_args['filename']
@@ -117,7 +183,7 @@ MakeChecksumTaskArgs = TypedDict("MakeChecksumTaskArgs", {
 
 
 class MakeChecksumBatchSingleWorkflow(
-    CreateChecksumWorkflow[UserArgs, MakeChecksumTaskArgs]
+    CreateChecksumWorkflow[MakeChecksumUserArgs, MakeChecksumBatchTaskArgs]
 ):
     """Workflow for generating a checksum report for single batch of files."""
 
@@ -139,39 +205,55 @@ class MakeChecksumBatchSingleWorkflow(
             speedwagon.tasks.Result[Never]
         ],
         additional_data: Mapping[str, Never],  # pylint: disable=W0613
-        user_args: UserArgs,
-    ) -> List[MakeChecksumTaskArgs]:
+        user_args: MakeChecksumUserArgs,
+    ) -> List[MakeChecksumBatchTaskArgs]:
         """Generate metadata for task."""
-        jobs = []
         package_root = user_args["Input"]
+        algorithm = user_args.get("Algorithm", DEFAULT_CHECKSUM_ALGORITHM)
         report_to_save_to = os.path.normpath(
-            os.path.join(package_root, DEFAULT_CHECKSUM_FILE_NAME)
+            os.path.join(package_root, checksum_file_name(algorithm))
+        )
+        return self.batch_files(
+            package_root,
+            self.locate_relative_files(package_root),
+            report_to_save_to,
+            algorithm
         )
-        for file_path in self.locate_files(package_root):
-            relpath = os.path.relpath(file_path, package_root)
-            job: MakeChecksumTaskArgs = {
-                "source_path": package_root,
-                "filename": relpath,
-                "save_to_filename": report_to_save_to
-            }
-            jobs.append(job)
-        return jobs
+
+    def create_new_task(
+        self,
+        task_builder: "speedwagon.tasks.TaskBuilder",
+        job_args: MakeChecksumBatchTaskArgs
+    ) -> None:
+        """Create a checksum generation task."""
+        filenames = job_args['filenames']
+        source_path = job_args['source_path']
+        report_name = job_args['save_to_filename']
+
+        new_task = tasks.MakeChecksumBatchTask(
+            source_path,
+            filenames,
+            report_name,
+            algorithm=job_args['algorithm']
+        )
+
+        task_builder.add_subtask(new_task)
 
     @classmethod
     @add_report_borders
     def generate_report(
         cls,
         results: List[
-            speedwagon.tasks.Result[tasks.MakeChecksumResult]
+            speedwagon.tasks.Result[List[tasks.MakeChecksumResult]]
         ],
-        user_args: UserArgs  # pylint: disable=unused-argument
+        user_args: MakeChecksumUserArgs  # pylint: disable=unused-argument
     ) -> Optional[str]:
         """Generate report based on number of files hash calculated in file."""
         report_lines = [
             f"Checksum values for {len(items_written)} "
             f"files written to {checksum_report}"
             for checksum_report, items_written in cls.sort_results(
-                [i.data for i in results]
+                cls.flatten_results(results)
             ).items()
         ]
 
@@ -189,24 +271,15 @@ class MakeChecksumBatchSingleWorkflow(
         input_path.add_validation(validators.ExistsOnFileSystem())
 
         return [
-            input_path
+            input_path,
+            _algorithm_option()
         ]
 
 
-MakeChecksumBatchMultipleTaskArgs = TypedDict(
-    "MakeChecksumBatchMultipleTaskArgs",
-    {
-        "source_path": str,
-        "filename": str,
-        "save_to_filename": str
-    }
-)
-
-
 class MakeChecksumBatchMultipleWorkflow(
     CreateChecksumWorkflow[
-        UserArgs,
-        MakeChecksumBatchMultipleTaskArgs
+        MakeChecksumUserArgs,
+        MakeChecksumBatchTaskArgs
     ]
 ):
     """Make checksum batch workflow for Speedwagon."""
@@ -230,29 +303,26 @@ class MakeChecksumBatchMultipleWorkflow(
             speedwagon.tasks.Result[Never]
         ],
         additional_data: Mapping[str, Never],  # pylint: disable=W0613
-        user_args: UserArgs,
-    ) -> List[MakeChecksumBatchMultipleTaskArgs]:
+        user_args: MakeChecksumUserArgs,
+    ) -> List[MakeChecksumBatchTaskArgs]:
         """Generate metadata for task."""
-        jobs = []
+        jobs: List[MakeChecksumBatchTaskArgs] = []
+        algorithm = user_args.get("Algorithm", DEFAULT_CHECKSUM_ALGORITHM)
+        report_name = checksum_file_name(algorithm)
 
         for sub_dir in filter(lambda it: it.is_dir(),
                               os.scandir(user_args["Input"])):
 
             package_root = sub_dir.path
             report_to_save_to = os.path.normpath(
-                os.path.join(package_root, DEFAULT_CHECKSUM_FILE_NAME)
+                os.path.join(package_root, report_name)
+            )
+            jobs += self.batch_files(
+                package_root,
+                self.locate_relative_files(package_root),
+                report_to_save_to,
+                algorithm
             )
-
-            for root, _, files in os.walk(package_root):
-                for file_ in files:
-                    full_path = os.path.join(root, file_)
-                    relpath = os.path.relpath(full_path, package_root)
-                    job: MakeChecksumBatchMultipleTaskArgs = {
-                        "source_path": package_root,
-                        "filename": relpath,
-                        "save_to_filename": report_to_save_to
-                    }
-                    jobs.append(job)
         return jobs
 
     def job_options(
@@ -265,23 +335,24 @@ class MakeChecksumBatchMultipleWorkflow(
         """Request input directory value from the user."""
         input_path = speedwagon.workflow.DirectorySelect("Input")
         input_path.add_validation(validators.ExistsOnFileSystem())
-        return [input_path]
+        return [input_path, _algorithm_option()]
 
     def create_new_task(
         self,
         task_builder: "speedwagon.tasks.TaskBuilder",
-        job_args: MakeChecksumBatchMultipleTaskArgs
+        job_args: MakeChecksumBatchTaskArgs
     ) -> None:
         """Create a checksum generation task."""
-        filename = job_args['filename']
+        filenames = job_args['filenames']
         report_name = job_args['save_to_filename']
         source_path = job_args['source_path']
 
         task_builder.add_subtask(
-            tasks.MakeChecksumTask(
+            tasks.MakeChecksumBatchTask(
                 source_path,
-                filename,
-                report_name
+                filenames,
+                report_name,
+                algorithm=job_args['algorithm']
             )
         )
 
@@ -290,16 +361,16 @@ class MakeChecksumBatchMultipleWorkflow(
     def generate_report(
         cls,
         results: List[
-            speedwagon.tasks.Result[tasks.validation.MakeChecksumResult]
+            speedwagon.tasks.Result[List[tasks.MakeChecksumResult]]
         ],
-        user_args: UserArgs  # pylint: disable=unused-argument
+        user_args: MakeChecksumUserArgs  # pylint: disable=unused-argument
     ) -> Optional[str]:
         """Generate report based on number of files hash calculated in file."""
         report_lines = [
             f"Checksum values for {len(items_written)} "
             f"files written to {checksum_report}"
             for checksum_report, items_written in cls.sort_results(
-                [i.data for i in results]
+                cls.flatten_results(results)
             ).items()
         ]
 
@@ -336,8 +407,7 @@ class RegenerateChecksumBatchSingleWorkflow(CreateChecksumWorkflow):
         report_to_save_to = user_args["Input"]
         package_root = os.path.dirname(report_to_save_to)
 
-        for file_path in self.locate_files(package_root):
-            relpath = os.path.relpath(file_path, package_root)
+        for relpath in self.locate_relative_files(package_root):
             jobs.append(
                 {
                     "source_path": package_root,
@@ -440,18 +510,15 @@ class RegenerateChecksumBatchMultipleWorkflow(CreateChecksumWorkflow):
                 os.path.join(package_root, DEFAULT_CHECKSUM_FILE_NAME)
             )
 
-            for root, _, files in os.walk(package_root):
-                for file_ in files:
-                    full_path = os.path.join(root, file_)
-                    if os.path.samefile(report_to_save_to, full_path):
-                        continue
-                    relpath = os.path.relpath(full_path, package_root)
-                    job: MakeChecksumTaskArgs = {
-                        "source_path": package_root,
-                        "filename": relpath,
-                        "save_to_filename": report_to_save_to
-                    }
-                    jobs.append(job)
+            for relpath in self.locate_relative_files(package_root):
+                if relpath == DEFAULT_CHECKSUM_FILE_NAME:
+                    continue
+                job: MakeChecksumTaskArgs = {
+                    "source_path": package_root,
+                    "filename": relpath,
+                    "save_to_filename": report_to_save_to
+                }
+                jobs.append(job)
         return jobs
 
     def completion_task(
@@ -3,13 +3,16 @@ from __future__ import annotations
 import os
 import abc
 import typing
-from typing import List, Optional, Iterable, Mapping, TypedDict
+from typing import (
+    Dict, List, Optional, Iterable, Iterator, Mapping, TypedDict
+)
 
 from uiucprescon import images
 
 import speedwagon
 import speedwagon.workflow
 from speedwagon import job, validators
+from speedwagon_uiucprescon import filesystem
 
 if typing.TYPE_CHECKING:
     import sys
@@ -28,22 +31,29 @@ ConvertFileTaskResult = typing.TypedDict(
 )
 
 
-def _filter_tif_only(item: os.DirEntry[str]) -> bool:
-    if not item.is_file():
-        return False
-
-    _, ext = os.path.splitext(item.name)
+def _in_access_directory(entry: os.DirEntry[str]) -> bool:
+    return os.path.basename(os.path.dirname(entry.path)) == "access"
 
-    if ext.lower() != ".tif":
-        return False
 
-    return True
+def _is_access_tif(entry: os.DirEntry[str]) -> bool:
+    return entry.name.lower().endswith(".tif") and \
+        _in_access_directory(entry) and \
+        entry.is_file()
 
 
 class AbsProfile(metaclass=abc.ABCMeta):
-    @abc.abstractmethod
     def locate_source_files(self, root: str) -> Iterable[str]:
-        pass
+        for entry in self.locate_source_entries(root):
+            yield entry.path
+
+    def locate_source_entries(self, root: str) -> Iterator[os.DirEntry[str]]:
+        # Access directories only hold the files to convert so they are not
+        # searched any deeper.
+        return filesystem.walk_files(
+            root,
+            include_file=_is_access_tif,
+            search_directory=lambda entry: not _in_access_directory(entry)
+        )
 
     @property
     @abc.abstractmethod
@@ -54,50 +64,21 @@ class AbsProfile(metaclass=abc.ABCMeta):
 class DigitalLibraryProfile(AbsProfile):
     image_factory = "Digital Library JPEG 2000"
 
-    def locate_source_files(self, root: str) -> Iterable[str]:
-        for root_access in self._find_root_access(root):
-            for source_file in filter(_filter_tif_only,
-                                      os.scandir(root_access)):
-
-                yield source_file.path
-
-    @staticmethod
-    def _find_root_access(path: str) -> Iterable[str]:
-        for root, dirs, _ in os.walk(path):
-            for _dir in dirs:
-                if _dir == "access":
-                    yield os.path.join(root, _dir)
-
 
 class HathiTrustProfile(AbsProfile):
     image_factory = "HathiTrust JPEG 2000"
 
-    def locate_source_files(self, root: str) -> Iterable[str]:
-
-        for root_access in self._find_root_access(root):
-            for source_file in filter(
-                    _filter_tif_only,
-                    os.scandir(root_access)):
-                yield source_file.path
-
-    @staticmethod
-    def _find_root_access(path: str) -> Iterable[str]:
-        for root, dirs, _ in os.walk(path):
-            for _dir in dirs:
-                if _dir == "access":
-                    yield os.path.join(root, _dir)
-
 
 class ProfileFactory:
-    profiles = {
-        "HathiTrust":  HathiTrustProfile,
-        "Digital Library": DigitalLibraryProfile
+    # Profiles do not hold any state so the same instance is shared.
+    profiles: Dict[str, AbsProfile] = {
+        "HathiTrust":  HathiTrustProfile(),
+        "Digital Library": DigitalLibraryProfile()
     }
 
     @classmethod
     def create(cls, name: str) -> AbsProfile:
-        new_profile = cls.profiles[name]
-        return new_profile()
+        return cls.profiles[name]
 
     @classmethod
     def profile_names(cls) -> Iterable[str]:
@@ -113,15 +94,22 @@ UserArgs = TypedDict(
     }
 )
 
+SourceFile = TypedDict(
+    "SourceFile",
+    {
+        "source_file": str,
+        "new_file_name": str,
+    }
+)
+
 JobArgs = TypedDict(
     "JobArgs",
     {
         "source_root": str,
-        "source_file": str,
         "relative_location": str,
         "destination_root": str,
-        "new_file_name": str,
         "image_factory": str,
+        "files": List[SourceFile],
     }
 )
 
@@ -191,35 +179,47 @@ class MakeJp2Workflow(job.Workflow[UserArgs]):
             **user_args:
 
         Returns:
-            Returns a list of job dictionaries containing input and output of
-                individual files along with their conversion profile.
+            Returns a list of job dictionaries, one for each directory of
+                source files, containing the input and output of the files
+                along with their conversion profile.
 
         """
-        jobs: List[JobArgs] = []
         source_root: str = user_args["Input"]
         destination_root: str = user_args["Output"]
         profile_name: str = user_args["Profile"]
         profile_factory = ProfileFactory()
         profile = profile_factory.create(profile_name)
-        for source_file in profile.locate_source_files(source_root):
 
-            new_name = \
-                f"{os.path.splitext(os.path.basename(source_file))[0]}.jp2"
-
-            rel_path = os.path.dirname(
-                os.path.relpath(source_file, source_root))
-
-            created_job: JobArgs = {
-                "source_root": os.path.normpath(source_root),
-                "source_file": os.path.basename(source_file),
-                "relative_location": os.path.normpath(rel_path),
-                "destination_root": os.path.normpath(destination_root),
-                "new_file_name": new_name,
-                "image_factory": profile.image_factory,
-            }
-            jobs.append(created_job)
-
-        return jobs
+        normalized_source_root = os.path.normpath(source_root)
+        normalized_destination_root = os.path.normpath(destination_root)
+        source_prefix_length = len(os.path.join(source_root, ""))
+
+        # Source files are located one directory at a time, so everything
+        # shared by the files in a directory is only worked out once.
+        jobs: Dict[str, JobArgs] = {}
+
+        for entry in profile.locate_source_entries(source_root):
+            source_dir = os.path.dirname(entry.path)
+            directory_job = jobs.get(source_dir)
+            if directory_job is None:
+                directory_job = {
+                    "source_root": normalized_source_root,
+                    "relative_location": os.path.normpath(
+                        source_dir[source_prefix_length:]
+                    ),
+                    "destination_root": normalized_destination_root,
+                    "image_factory": profile.image_factory,
+                    "files": [],
+                }
+                jobs[source_dir] = directory_job
+
+            # Source entries always end with a ".tif" extension
+            directory_job["files"].append({
+                "source_file": entry.name,
+                "new_file_name": f"{entry.name[:-4]}.jp2",
+            })
+
+        return list(jobs.values())
 
     def create_new_task(
         self,
@@ -228,39 +228,37 @@ class MakeJp2Workflow(job.Workflow[UserArgs]):
     ) -> None:
         """Add a new task to be accomplished when the workflow is started.
 
-        This creates 2 subtasks.
-           * Subtask for creating a destination folder
-           * Subtask generating a jp2
+        This creates the following subtasks.
+           * Subtask for creating the destination folder
+           * Subtask generating a jp2 for each file in the folder
 
         Args:
             task_builder:
             **job_args:
 
         """
-        source_root = job_args['source_root']
-        source_file = job_args["source_file"]
         relative_location = job_args["relative_location"]
-        destination_root = job_args["destination_root"]
-        new_name = job_args["new_file_name"]
         image_factory = job_args["image_factory"]
 
-        source_file = os.path.join(source_root, relative_location, source_file)
-
-        destination_file = os.path.join(destination_root,
-                                        relative_location, new_name)
-
-        make_dir = EnsurePathTask(
-            os.path.join(destination_root, relative_location)
-        )
-
-        convert_task = ConvertFileTask(
-            source_file=source_file,
-            destination_file=destination_file,
-            image_factory_name=image_factory
+        source_dir = os.path.join(job_args['source_root'], relative_location)
+        destination_dir = os.path.join(
+            job_args["destination_root"], relative_location
         )
 
-        task_builder.add_subtask(make_dir)
-        task_builder.add_subtask(convert_task)
+        task_builder.add_subtask(EnsurePathTask(destination_dir))
+
+        for file_args in job_args["files"]:
+            task_builder.add_subtask(
+                ConvertFileTask(
+                    source_file=os.path.join(
+                        source_dir, file_args["source_file"]
+                    ),
+                    destination_file=os.path.join(
+                        destination_dir, file_args["new_file_name"]
+                    ),
+                    image_factory_name=image_factory
+                )
+            )
 
     @classmethod
     def generate_report(
@@ -301,9 +299,11 @@ class EnsurePathTask(speedwagon.tasks.Subtask[None]):
         return f"Verifying directory {self._path}"
 
     def work(self) -> bool:
-        if not os.path.exists(self._path):
-            self.log(f"Creating {self._path}")
+        try:
             os.makedirs(self._path)
+        except FileExistsError:
+            return True
+        self.log(f"Created {self._path}")
         return True
 
 
@@ -7,9 +7,13 @@ Added on 3/30/2022
 from __future__ import annotations
 import abc
 import os
-import pathlib
+import re
+import stat
 import typing
-from typing import List, Dict, Optional, Iterator, Union, TypedDict, Mapping
+from typing import (
+    Container, List, Dict, Optional, Iterator, Tuple, Union, TypedDict,
+    Mapping
+)
 from pathlib import Path
 
 import speedwagon
@@ -46,6 +50,16 @@ TaskArgs = TypedDict(
     }
 )
 
+FileBatchTaskArgs = TypedDict(
+    "FileBatchTaskArgs", {
+        "type": str,
+        "paths": List[str]
+    }
+)
+
+# Number of files removed together by a single task
+DELETE_BATCH_SIZE = 512
+
 
 class MedusaPreingestCuration(speedwagon.Workflow[UserArgs]):
     """Medusa Preingest curation Workflow."""
@@ -65,23 +79,6 @@ class MedusaPreingestCuration(speedwagon.Workflow[UserArgs]):
         task_builder.add_subtask(FindOffendingFiles(**user_args))
         super().initial_task(task_builder, user_args)
 
-    @staticmethod
-    def _build_task(item: pathlib.Path) -> TaskArgs:
-        if item.is_dir():
-            return {
-                "type": "directory",
-                "path": str(item)
-            }
-        if item.is_file():
-            return {
-                "type": "file",
-                "path": str(item),
-            }
-        raise RuntimeError(
-            f'not sure what to do. "{item}" is not '
-            f'considered a file or a directory.'
-        )
-
     def discover_task_metadata(
         self,
         initial_results: List[  # pylint: disable=unused-argument
@@ -89,26 +86,56 @@ class MedusaPreingestCuration(speedwagon.Workflow[UserArgs]):
         ],
         additional_data: Mapping[str, List[str]],
         user_args: UserArgs,  # pylint: disable=unused-argument
-    ) -> List[TaskArgs]:
-        """Organize the order the files & directories should be removed."""
-        new_tasks: List[TaskArgs] = []
+    ) -> List[Union[TaskArgs, FileBatchTaskArgs]]:
+        """Organize the order the files & directories should be removed.
+
+        Files are grouped into batches which are all removed before any of
+        the directories so that every directory is empty when it is removed.
+        """
+        file_paths: List[str] = []
+        directory_tasks: List[TaskArgs] = []
         to_remove: typing.Set[str] = set()
 
+        # Paths are compared in their normalized form. A directory is only
+        # added once everything inside it has been, so a directory that is
+        # already in the set does not need to be searched again.
         for item in additional_data.get('to remove', []):
-            if str(item) in to_remove:
+            key = os.path.normpath(item)
+            if key in to_remove:
                 continue
-            if os.path.isdir(item):
-                for child_item in get_contents_of_folder_for_removal(item):
-                    if str(child_item) in to_remove:
+            try:
+                mode = os.stat(item).st_mode
+            except OSError:
+                # Items that no longer exist have nothing left to remove.
+                mode = 0
+            if stat.S_ISDIR(mode):
+                # The walk already knows which items are directories so
+                # they are not looked up again here.
+                for child_item, is_directory in _walk_for_removal(
+                    item, exclude=to_remove
+                ):
+                    child_key = os.path.normpath(child_item)
+                    if child_key in to_remove:
                         continue
-                    new_tasks.append(self._build_task(child_item))
-                    to_remove.add(str(child_item))
-            elif os.path.isfile(item):
-                new_tasks.append({
-                    "type": "file",
-                    "path": item,
-                })
-            to_remove.add(item)
+                    if is_directory:
+                        directory_tasks.append({
+                            "type": "directory",
+                            "path": child_key
+                        })
+                    else:
+                        file_paths.append(child_key)
+                    to_remove.add(child_key)
+            elif stat.S_ISREG(mode):
+                file_paths.append(key)
+            to_remove.add(key)
+
+        new_tasks: List[Union[TaskArgs, FileBatchTaskArgs]] = [
+            {
+                "type": "file_batch",
+                "paths": file_paths[index:index + DELETE_BATCH_SIZE]
+            } for index in range(0, len(file_paths), DELETE_BATCH_SIZE)
+        ]
+        new_tasks += directory_tasks
         return new_tasks
 
     AdditionalInfo = TypedDict("AdditionalInfo", {"to remove": List[str]})
@@ -138,9 +165,16 @@ class MedusaPreingestCuration(speedwagon.Workflow[UserArgs]):
         files: List[str] = []
 
         for item in data:
-            if os.path.isdir(item):
+            # A single stat is enough to tell files and directories apart.
+            try:
+                mode = os.stat(item).st_mode
+            except OSError as error:
+                raise ValueError(
+                    f"Unable to determine if file or directory: {item}."
+                ) from error
+            if stat.S_ISDIR(mode):
                 dirs.append(item)
-            elif os.path.isfile(item):
+            elif stat.S_ISREG(mode):
                 files.append(item)
             else:
                 raise ValueError(
@@ -211,46 +245,67 @@ class MedusaPreingestCuration(speedwagon.Workflow[UserArgs]):
             results:
             **user_args:
         """
-        items_deleted = [
-            result.data for result in results if result.source in [
-                filesystem_tasks.DeleteFile,
-                filesystem_tasks.DeleteDirectory
-            ]
-        ]
-
         report_lines = [
             "*" * 80,
             "Deleted the following files and/or folders",
             "------------------------------------------",
             "\n",
-            "\n".join([f"* {item}" for item in items_deleted]),
+            "\n".join(
+                f"* {item}" for item in cls._iter_deleted_items(results)
+            ),
             "*" * 80,
         ]
         return "\n".join(report_lines)
 
+    @staticmethod
+    def _iter_deleted_items(
+        results: List[tasks.Result[List[str]]]
+    ) -> Iterator[str]:
+        for result in results:
+            if result.source is DeleteFiles:
+                yield from result.data
+            elif result.source in (
+                filesystem_tasks.DeleteFile,
+                filesystem_tasks.DeleteDirectory
+            ):
+                yield typing.cast(str, result.data)
+
     def create_new_task(
         self,
         task_builder: tasks.TaskBuilder,
-        job_args: TaskArgs
+        job_args: Union[TaskArgs, FileBatchTaskArgs]
     ) -> None:
-        """Add a delete file or delete directory task to the task list.
+        """Add a delete files or delete directory task to the task list.
 
         Args:
             task_builder:
             **job_args:
         """
-        if job_args['type'] == "file":
+        if job_args['type'] == "file_batch":
             task_builder.add_subtask(
-                filesystem_tasks.DeleteFile(job_args["path"])
+                DeleteFiles(typing.cast(FileBatchTaskArgs, job_args)["paths"])
+            )
+        elif job_args['type'] == "file":
+            task_builder.add_subtask(
+                filesystem_tasks.DeleteFile(
+                    typing.cast(TaskArgs, job_args)["path"]
+                )
             )
         elif job_args['type'] == "directory":
             task_builder.add_subtask(
-                filesystem_tasks.DeleteDirectory(job_args["path"])
+                filesystem_tasks.DeleteDirectory(
+                    typing.cast(TaskArgs, job_args)["path"]
+                )
             )
 
 
 class AbsChecker(abc.ABC):  # pylint: disable=R0903
 
+    # Regular expression matched against the start of the name of items
+    # that are not valid. Checkers that only need the name set this so
+    # that OffendingPathDecider can test them all with a single regex.
+    name_pattern: Optional[str] = None
+
     @abc.abstractmethod
     def is_valid(self, path: Path) -> bool:
         """Is path valid."""
@@ -263,16 +318,22 @@ class AbsPathItemDecision(abc.ABC):  # pylint: disable=R0903
 
 
 class DsStoreChecker(AbsChecker):  # pylint: disable=R0903
+    name_pattern = r"\.DS_Store\Z"
+
     def is_valid(self, path: Path) -> bool:
         return path.name != ".DS_Store"
 
 
 class ThumbsDbChecker(AbsChecker):  # pylint: disable=R0903
+    name_pattern = r"Thumbs\.db\Z"
+
     def is_valid(self, path: Path) -> bool:
         return path.name != "Thumbs.db"
 
 
 class DotUnderScoreChecker(AbsChecker):  # pylint: disable=R0903
+    name_pattern = r"\._"
+
     def is_valid(self, path: Path) -> bool:
         return not path.name.startswith("._")
 
@@ -280,21 +341,35 @@ class DotUnderScoreChecker(AbsChecker):  # pylint: disable=R0903
 class CaptureOneChecker(AbsChecker):
 
     def is_valid(self, path: Path) -> bool:
-        if not path.is_dir():
+        # Only check the file system for items with a matching name
+        if path.name != "CaptureOne":
             return True
-        return path.name != "CaptureOne"
+        return not path.is_dir()
 
 
 class OffendingPathDecider(AbsPathItemDecision):
 
     def __init__(self) -> None:
         self._checkers: List[AbsChecker] = []
+        self._name_patterns: List[str] = []
+        self._name_regex: Optional[typing.Pattern[str]] = None
 
     def add_checker(self, value: AbsChecker) -> None:
-        self._checkers.append(value)
+        if value.name_pattern is None:
+            self._checkers.append(value)
+            return
+        self._name_patterns.append(value.name_pattern)
+        self._name_regex = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in self._name_patterns)
+        )
 
     def is_offending(self, path: Path) -> bool:
-        return any(not checker.is_valid(path) for checker in self._checkers)
+        if self._name_regex is not None and self._name_regex.match(path.name):
+            return True
+        for checker in self._checkers:
+            if not checker.is_valid(path):
+                return True
+        return False
 
 
 class FindOffendingFiles(tasks.Subtask[List[str]]):
@@ -328,22 +403,57 @@ class FindOffendingFiles(tasks.Subtask[List[str]]):
         return True
 
     def locate_results(self) -> List[str]:
+        root = Path(self.root)
+        is_offending = self.file_deciding_strategy.is_offending
         return [
             item
             for item in self.filesystem_locator_strategy.locate(self.root)
-            if self.file_deciding_strategy.is_offending(
-                Path(self.root) / Path(item)
-            )
+            if is_offending(root / item)
         ]
 
 
+class DeleteFiles(tasks.Subtask[List[str]]):
+    name = "Delete Files"
+
+    def __init__(self, paths: List[str]) -> None:
+        super().__init__()
+        self.paths = paths
+
+    def task_description(self) -> Optional[str]:
+        return f"Deleting {len(self.paths)} file(s)"
+
+    def work(self) -> bool:
+        removed: List[str] = []
+        try:
+            for path in self.paths:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    self.log(f"Unable to delete {path}. It no longer exists")
+                    continue
+                removed.append(path)
+        except OSError:
+            # Record what was deleted before the batch stopped so it is not
+            # lost with the error.
+            self.log("\n".join(["Deleted before the error:", *removed]))
+            self.set_results(removed)
+            raise
+        self.log(f"Deleted {len(removed)} file(s)")
+        self.set_results(removed)
+        return True
+
+
 class FilesystemItemLocator:
 
     def locate(self, path: str) -> Iterator[str]:
         if not os.path.exists(path):
             raise FileNotFoundError(f"Could not find {path}")
-        for item in get_contents_of_folder_for_removal(path):
-            yield os.path.relpath(item, start=path)
+        # Every item found is below path so the relative path is the rest
+        # of the string after it. This avoids os.path.relpath, which makes
+        # both paths absolute on every call.
+        prefix_length = len(os.path.join(path, ""))
+        for item, _ in _walk_for_removal(path):
+            yield item[prefix_length:] if item != path else os.curdir
 
 
 def find_capture_one_data(directory: str) -> Iterator[str]:
@@ -351,29 +461,62 @@ def find_capture_one_data(directory: str) -> Iterator[str]:
         os.path.join(directory, "CaptureOne")
 
     if os.path.exists(potential_capture_one_dir_name):
-        for root, dirs, files in os.walk(potential_capture_one_dir_name):
-            for file_name in files:
-                yield os.path.join(root, file_name)
-            for dir_name in dirs:
-                yield os.path.join(root, dir_name)
-        yield potential_capture_one_dir_name
+        # Contents are listed before the directories holding them, ending
+        # with the CaptureOne directory itself.
+        yield from map(
+            str,
+            get_contents_of_folder_for_removal(potential_capture_one_dir_name)
+        )
 
 
 def get_contents_of_folder_for_removal(
-    root: Union[Path, str]
+    root: Union[Path, str],
+    exclude: Container[str] = ()
 ) -> Iterator[Path]:
     """Locate files and folders in the path.
 
     This function guarantees that the content of a folder is listed before
     the folder itself. This is to help delete items in the right order.
+
+    Args:
+        root: Path to search.
+        exclude: Normalized paths of subdirectories to leave out, together
+            with everything inside them.
     """
-    root = Path(root)
-    files = []
-
-    for item in root.iterdir():
-        if item.is_dir():
-            yield from get_contents_of_folder_for_removal(item)
-        else:
-            files.append(item)
-    yield from files
-    yield root
+    for item, _ in _walk_for_removal(root, exclude):
+        yield Path(item)
+
+
+def _walk_for_removal(
+    root: Union[Path, str],
+    exclude: Container[str] = ()
+) -> Iterator[Tuple[str, bool]]:
+    # Yields the path of each item and whether it is a directory, in the
+    # order of get_contents_of_folder_for_removal. Symlinks are never
+    # followed and are listed as files.
+    #
+    # Each directory is on the stack twice. The first time it is scanned and
+    # the second time, after everything in its subdirectories, its files
+    # and the directory itself are listed.
+    stack: List[Tuple[str, Optional[List[str]]]] = [(str(root), None)]
+    while stack:
+        directory, files = stack.pop()
+        if files is not None:
+            for file in files:
+                yield file, False
+            yield directory, True
+            continue
+
+        files = []
+        subdirectories = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.normpath(entry.path) not in exclude:
+                        subdirectories.append(entry.path)
+                else:
+                    files.append(entry.path)
+        stack.append((directory, files))
+        stack.extend(
+            (subdirectory, None) for subdirectory in reversed(subdirectories)
+        )
@@ -2,15 +2,22 @@
 from __future__ import annotations
 import io
 import os
+import sys
+import tempfile
+import threading
 import typing
 
-from typing import List, Any, Optional, Iterator, Mapping, TypedDict
+from typing import (
+    List, Any, Dict, Optional, Iterator, Mapping, TypedDict
+)
 import contextlib
 from uiucprescon import ocr
+import uiucprescon.ocr.reader
 
 import speedwagon
 import speedwagon.workflow
 from speedwagon import validators
+from speedwagon_uiucprescon import filesystem
 
 from speedwagon.exceptions import \
     MissingConfiguration, \
@@ -30,16 +37,82 @@ def locate_tessdata() -> Optional[str]:
     return None
 
 
+TRAINEDDATA_EXTENSION = ".traineddata"
+
+
 def path_contains_traineddata(path: str) -> bool:
-    for file in os.scandir(path):
-        if not file.is_file():
-            continue
-        _, ext = os.path.splitext(file.name)
-        if ext == ".traineddata":
-            return True
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.endswith(TRAINEDDATA_EXTENSION) and \
+                    entry.is_file():
+                return True
     return False
 
 
+# Only one capture can redirect the stderr file descriptor at a time
+_STDERR_LOCK = threading.RLock()
+
+
+@contextlib.contextmanager
+def _capture_stderr(native: bool = False) -> Iterator[io.StringIO]:
+    """Capture what is written to sys.stderr while inside the context.
+
+    Tesseract writes its warnings straight to the stderr file descriptor,
+    which sys.stderr does not see. If native is True, the file descriptor
+    is redirected too and the captured text is added to the yielded buffer
+    when the context exits.
+
+    Redirecting the file descriptor is process-global. Anything another
+    thread writes to stderr in the meantime is captured too, and native
+    captures in other threads wait until this one has exited so the
+    original stderr is always restored.
+    """
+    if not native:
+        messages = io.StringIO()
+        with contextlib.redirect_stderr(messages):
+            yield messages
+        return
+
+    with _STDERR_LOCK:
+        with _redirect_stderr() as messages:
+            yield messages
+
+
+@contextlib.contextmanager
+def _redirect_stderr() -> Iterator[io.StringIO]:
+    messages = io.StringIO()
+    try:
+        saved_stderr = os.dup(2)
+    except OSError:
+        # There is no stderr file descriptor to redirect, for example when
+        # running as a windowed application.
+        with contextlib.redirect_stderr(messages):
+            yield messages
+        return
+
+    with tempfile.TemporaryFile() as captured:
+        if sys.__stderr__ is not None:
+            # Keep anything written before this out of the capture
+            sys.__stderr__.flush()
+        with contextlib.redirect_stderr(messages):
+            os.dup2(captured.fileno(), 2)
+            try:
+                yield messages
+            finally:
+                os.dup2(saved_stderr, 2)
+                os.close(saved_stderr)
+        captured.seek(0)
+        messages.write(captured.read().decode("utf-8", errors="replace"))
+
+
+def get_language_code(language: str) -> str:
+    """Look up the tesseract language code for a language name."""
+    for code, name in ocr.LANGUAGE_CODES.items():
+        if name == language:
+            return code
+    raise ValueError(f"Unable to look up language code for {language}")
+
+
 ReportFormat = typing.TypedDict("ReportFormat", {"text": str, "source": str})
 UserArgs = TypedDict(
     "UserArgs",
@@ -129,19 +202,10 @@ class OCRWorkflow(speedwagon.Workflow[UserArgs]):
             )
 
         new_tasks: List[JobArgs] = []
+        language_code = get_language_code(user_args["Language"])
 
         for result in initial_results:
             for image_file in result.data:
-                for key, value in ocr.LANGUAGE_CODES.items():
-                    if value == user_args["Language"]:
-                        language_code = key
-                        break
-                else:
-                    language = user_args["Language"]
-                    raise ValueError(
-                        f"Unable to look up language code for {language}"
-                    )
-
                 base_name = os.path.splitext(os.path.basename(image_file))[0]
                 new_task: JobArgs = {
                     "source_file_path": image_file,
@@ -258,23 +322,14 @@ class OCRWorkflow(speedwagon.Workflow[UserArgs]):
     @staticmethod
     def get_available_languages(path: str) -> Iterator[str]:
         """Get languages accessible based on the available data files."""
-
-        def filter_only_trainingdata(item: os.DirEntry[str]) -> bool:
-            if not item.is_file():
-                return False
-
-            base, ext = os.path.splitext(item.name)
-
-            if ext != ".traineddata":
-                return False
-
-            if base == "osd":
-                return False
-
-            return True
-
-        for file in filter(filter_only_trainingdata, os.scandir(path)):
-            yield os.path.splitext(file.name)[0]
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(TRAINEDDATA_EXTENSION) or \
+                        name == f"osd{TRAINEDDATA_EXTENSION}":
+                    continue
+                if entry.is_file():
+                    yield name[:-len(TRAINEDDATA_EXTENSION)]
 
     @classmethod
     def generate_report(
@@ -342,6 +397,12 @@ class OCRWorkflow(speedwagon.Workflow[UserArgs]):
 class FindImagesTask(speedwagon.tasks.Subtask[List[str]]):
     name = "Finding Images"
 
+    # Directories that never hold images to OCR are not searched. Hidden
+    # directories, with names starting with a dot, are skipped as well.
+    skipped_directory_names: typing.AbstractSet[str] = \
+        frozenset({"CaptureOne", "__pycache__"})
+    skip_hidden_directories = True
+
     def __init__(self, root: str, file_extension: str) -> None:
         super().__init__()
         self._root = root
@@ -353,32 +414,51 @@ class FindImagesTask(speedwagon.tasks.Subtask[List[str]]):
 
     def work(self) -> bool:
         self.log(f"Locating {self._extension} files in {self._root}")
+        extension = self._extension.lower()
+        skipped_names = self.skipped_directory_names
+        skip_hidden = self.skip_hidden_directories
 
-        def find_images(file_located: str) -> bool:
-
-            if os.path.isdir(file_located):
+        def search_directory(entry: os.DirEntry[str]) -> bool:
+            if entry.name in skipped_names:
                 return False
+            return not (skip_hidden and entry.name.startswith("."))
 
-            _, ext = os.path.splitext(file_located)
-            if ext.lower() != self._extension:
-                return False
-
-            return True
+        image_files = [
+            entry.path for entry in filesystem.walk_files(
+                self._root,
+                include_file=lambda entry: entry.name.lower().endswith(
+                    extension
+                ),
+                search_directory=search_directory
+            )
+        ]
+        self.log(f"Located {len(image_files)} {self._extension} file(s)")
+        self.set_results(image_files)
 
-        directories = []
+        return True
 
-        for root, _, files in os.walk(self._root):
-            for file_name in filter(find_images, files):
-                file_path = os.path.join(root, file_name)
-                self.log(f"Located {file_path}")
-                directories.append(file_path)
-        self.set_results(directories)
 
-        return True
+class _ThreadReaders(threading.local):
+    # Readers created by the current thread, by language, and the engine
+    # that created them.
+    def __init__(self) -> None:
+        super().__init__()
+        self.engine: Optional[ocr.Engine] = None
+        self.readers: Dict[str, uiucprescon.ocr.reader.Reader] = {}
 
 
 class GenerateOCRFileTask(speedwagon.tasks.Subtask[ReportFormat]):
     engine: Optional[ocr.Engine] = None
+
+    # Readers are expensive to create so they are shared by the tasks that
+    # run on the same thread with the same engine. Each thread has its own
+    # because a tesseract reader cannot be used by two threads at once.
+    _readers = _ThreadReaders()
+
+    # Capturing tesseract's own warnings redirects the stderr file
+    # descriptor of the whole process, so only one image can be read at a
+    # time while it is on.
+    capture_native_stderr = False
     name = "Optical character recognition"
 
     def __init__(self,
@@ -403,9 +483,26 @@ class GenerateOCRFileTask(speedwagon.tasks.Subtask[ReportFormat]):
         if path is None:
             path = locate_tessdata()
         assert path is not None
+        if cls.engine is not None and cls.engine.data_set_path == path:
+            return
         cls.engine = ocr.Engine(path)
+        cls._readers.readers.clear()
         assert cls.engine is not None
 
+    def _get_reader(self, lang: str) -> uiucprescon.ocr.reader.Reader:
+        assert self.engine is not None
+        thread_readers = self._readers
+        if thread_readers.engine is not self.engine:
+            # The engine was replaced by set_tess_path so the readers from
+            # the previous one are dropped.
+            thread_readers.engine = self.engine
+            thread_readers.readers = {}
+        reader = thread_readers.readers.get(lang)
+        if reader is None:
+            reader = self.engine.get_reader(lang)
+            thread_readers.readers[lang] = reader
+        return reader
+
     def write_data(self, data: str, file_handle: io.TextIOWrapper) -> None:
         file_handle.write(data)
 
@@ -433,12 +530,12 @@ class GenerateOCRFileTask(speedwagon.tasks.Subtask[ReportFormat]):
             self.engine.data_set_path = self._tesseract_path
 
         # Get the ocr text reader for the proper language
-        reader = self.engine.get_reader(lang)
+        reader = self._get_reader(lang)
         self.log(f"Reading {os.path.normcase(file)}")
 
-        file_handle = io.StringIO()
-
-        with contextlib.redirect_stderr(file_handle):
+        with _capture_stderr(
+            native=self.capture_native_stderr
+        ) as file_handle:
             # Capture the warning messages
             try:
                 resulting_text = reader.read(file)
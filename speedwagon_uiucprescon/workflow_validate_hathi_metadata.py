@@ -10,6 +10,7 @@ from speedwagon.job import Workflow
 from speedwagon import workflow
 
 from speedwagon_uiucprescon import conditions
+from speedwagon_uiucprescon.tasks.validation import get_profile_validator
 
 if TYPE_CHECKING:
     import sys
@@ -99,9 +100,7 @@ class MetadataValidatorTask(speedwagon.tasks.Subtask[imagevalidate.Report]):
         return f"Validating Metadata for {self._source_file}"
 
     def work(self) -> bool:
-        hathi_tiff_profile = imagevalidate.Profile(
-            imagevalidate.get_profile('HathiTrust Tiff')
-        )
+        hathi_tiff_profile = get_profile_validator('HathiTrust Tiff')
 
         report = hathi_tiff_profile.validate(self._source_file)
         self.log(str(report))
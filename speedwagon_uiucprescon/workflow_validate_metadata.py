@@ -1,8 +1,8 @@
 """Validating technical metadata."""
 from __future__ import annotations
 
-import os
-from typing import Optional, List, TypedDict, Mapping, TYPE_CHECKING
+import typing
+from typing import Optional, List, TypedDict, Mapping, TYPE_CHECKING, Union
 
 
 from uiucprescon import imagevalidate
@@ -10,7 +10,7 @@ from uiucprescon import imagevalidate
 import speedwagon
 import speedwagon.workflow
 from speedwagon.job import Workflow
-from speedwagon_uiucprescon import tasks, conditions
+from speedwagon_uiucprescon import tasks, conditions, filesystem
 
 if TYPE_CHECKING:
     import sys
@@ -21,9 +21,12 @@ if TYPE_CHECKING:
 
 __all__ = ['ValidateMetadataWorkflow']
 
+# Number of image files validated together by a single task
+VALIDATION_BATCH_SIZE = 64
+
 
 JobValues = TypedDict("JobValues", {
-    "filename": str,
+    "filenames": List[str],
     "profile_name": str,
 })
 
@@ -62,14 +65,12 @@ class ValidateMetadataWorkflow(Workflow[UserArgs]):
         user_args: UserArgs,
     ) -> List[JobValues]:
         """Create task metadata based on the files located."""
-        new_tasks: List[JobValues] = []
-
-        for image_file in initial_results[0].data:
-            new_tasks.append({
-                "filename": image_file,
-                "profile_name": user_args["Profile"]
-            })
-        return new_tasks
+        image_files = initial_results[0].data
+        profile_name = user_args["Profile"]
+        return [{
+            "filenames": image_files[index:index + VALIDATION_BATCH_SIZE],
+            "profile_name": profile_name
+        } for index in range(0, len(image_files), VALIDATION_BATCH_SIZE)]
 
     def initial_task(
         self,
@@ -121,11 +122,9 @@ class ValidateMetadataWorkflow(Workflow[UserArgs]):
         job_args: JobValues
     ) -> None:
         """Create validation tasks."""
-        filename = job_args["filename"]
-
         subtask = \
-            tasks.ValidateImageMetadataTask(
-                filename,
+            tasks.ValidateImageMetadataBatchTask(
+                job_args["filenames"],
                 job_args["profile_name"]
             )
 
@@ -136,48 +135,37 @@ class ValidateMetadataWorkflow(Workflow[UserArgs]):
         cls,
         results: List[
             speedwagon.tasks.Result[
-                tasks.validation.ValidateImageMetadataResult
+                Union[
+                    tasks.validation.ValidateImageMetadataResult,
+                    List[tasks.validation.ValidateImageMetadataResult]
+                ]
             ]
         ],
         user_args: UserArgs
     ) -> Optional[str]:
         """Generate validation report as a string."""
-
-        def validation_result_filter(
-            task_result: speedwagon.tasks.Result[
-                tasks.validation.ValidateImageMetadataResult
-            ]
-        ) -> bool:
-            return task_result.source == tasks.ValidateImageMetadataTask
-
-        def filter_only_invalid(
-            task_result: tasks.validation.ValidateImageMetadataResult
-        ) -> bool:
-            return not task_result["valid"]
-
-        def invalid_messages(
-            task_result: tasks.validation.ValidateImageMetadataResult
-        ) -> str:
-            source = task_result["filename"]
-
-            messages = task_result["report"]
-
-            message = "\n".join([
-                f"{source}",
-                messages
-            ])
-            return message
-
-        data = list(
-            map(lambda x: x.data, filter(validation_result_filter, results))
-        )
+        data: List[tasks.validation.ValidateImageMetadataResult] = []
+        for result in results:
+            if result.source == tasks.ValidateImageMetadataBatchTask:
+                data += typing.cast(
+                    List[tasks.validation.ValidateImageMetadataResult],
+                    result.data
+                )
+            elif result.source == tasks.ValidateImageMetadataTask:
+                data.append(
+                    typing.cast(
+                        tasks.validation.ValidateImageMetadataResult,
+                        result.data
+                    )
+                )
 
         line_sep = "\n" + "-" * 60
         total_results = len(data)
-        filtered_data = filter(filter_only_invalid, data)
-        data_points = list(map(invalid_messages, filtered_data))
 
-        report_data = "\n\n".join(data_points)
+        report_data = "\n\n".join(
+            f"{task_result['filename']}\n{task_result['report']}"
+            for task_result in data if not task_result["valid"]
+        )
 
         summary = "\n".join([
             f"Validated files located in: {user_args['Input']}",
@@ -206,19 +194,25 @@ class LocateImagesTask(speedwagon.tasks.Subtask[List[str]]):
         self._root = root
 
         self._profile = imagevalidate.get_profile(profile_name)
+        # Lower-cased extensions as a tuple so they can be passed to
+        # str.endswith.
+        self._suffixes = tuple(
+            extension.lower() for extension in self._profile.valid_extensions
+        )
 
     def task_description(self) -> Optional[str]:
         return f"Locating images in {self._root}"
 
     def work(self) -> bool:
-        image_files = []
-        for root, _, files in os.walk(self._root):
-            for file_name in files:
-                _, ext = os.path.splitext(file_name)
-                if ext.lower() not in self._profile.valid_extensions:
-                    continue
-                image_file = os.path.join(root, file_name)
-                self.log(f"Found {image_file}")
-                image_files.append(image_file)
+        suffixes = self._suffixes
+        image_files = [
+            entry.path for entry in filesystem.walk_files(
+                self._root,
+                include_file=lambda entry: entry.name.lower().endswith(
+                    suffixes
+                )
+            )
+        ]
+        self.log(f"Found {len(image_files)} image file(s) in {self._root}")
         self.set_results(image_files)
         return True
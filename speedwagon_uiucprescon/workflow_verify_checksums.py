@@ -3,10 +3,11 @@
 from __future__ import annotations
 import abc
 import collections
-import itertools
+import concurrent.futures
 import os
+import typing
 from typing import (
-    DefaultDict, Iterable, Optional, Dict, List, Union, TypedDict,
+    Callable, DefaultDict, Iterable, Optional, Dict, List, Union, TypedDict,
     TYPE_CHECKING, Mapping
 )
 
@@ -17,6 +18,10 @@ from speedwagon.job import Workflow
 from speedwagon.reports import add_report_borders
 from speedwagon import workflow, validators
 from speedwagon_uiucprescon import conditions
+from speedwagon_uiucprescon.tasks.validation import (
+    CHECKSUM_WORKERS,
+    calculate_file_hash,
+)
 
 if TYPE_CHECKING:
     import sys
@@ -53,6 +58,9 @@ ChecksumWorkflowJobArgs = TypedDict("ChecksumWorkflowJobArgs", {
     "Input": str
 })
 
+# Number of files validated together by a single task
+VALIDATE_BATCH_SIZE = 64
+
 
 class ChecksumWorkflow(Workflow[ChecksumWorkflowJobArgs]):
     """Checksum validation workflow for Speedwagon."""
@@ -78,6 +86,12 @@ class ChecksumWorkflow(Workflow[ChecksumWorkflowJobArgs]):
 
     )
 
+    BatchTaskArgs = TypedDict(
+        "BatchTaskArgs", {
+            "files": List[TaskArgs],
+        }
+    )
+
     @staticmethod
     def locate_checksum_files(root: str) -> Iterable[str]:
         """Locate any checksum.md5 files located inside a directory.
@@ -101,19 +115,34 @@ class ChecksumWorkflow(Workflow[ChecksumWorkflowJobArgs]):
             None
         ],
         user_args: ChecksumWorkflowJobArgs  # pylint: disable=unused-argument
-    ) -> List[TaskArgs]:
-        """Read the values inside the checksum report."""
-        jobs: List[ChecksumWorkflow.TaskArgs] = []
+    ) -> List[BatchTaskArgs]:
+        """Read the values inside the checksum report.
+
+        The files to check are grouped into batches of VALIDATE_BATCH_SIZE.
+        Entries from different reports for the same file are kept in the
+        same batch so that the file is only hashed once.
+        """
+        # The report entries already have the fields of TaskArgs so they
+        # are used as they are.
+        entries_by_file: Dict[str, List[ChecksumWorkflow.TaskArgs]] = {}
         for result in initial_results:
             for file_to_check in result.data:
-                new_job: ChecksumWorkflow.TaskArgs = {
-                    "expected_hash": file_to_check["expected_hash"],
-                    "filename": file_to_check["filename"],
-                    "path": file_to_check["path"],
-                    "source_report": file_to_check["source_report"],
-                }
-                jobs.append(new_job)
-        return jobs
+                entries_by_file.setdefault(
+                    _checksum_file_path(file_to_check), []
+                ).append(file_to_check)
+
+        grouped_entries = list(entries_by_file.values())
+        return [
+            {
+                "files": [
+                    entry
+                    for entries in
+                    grouped_entries[index:index + VALIDATE_BATCH_SIZE]
+                    for entry in entries
+                ]
+            }
+            for index in range(0, len(grouped_entries), VALIDATE_BATCH_SIZE)
+        ]
 
     def job_options(
         self
@@ -152,40 +181,44 @@ class ChecksumWorkflow(Workflow[ChecksumWorkflowJobArgs]):
     def create_new_task(
         self,
         task_builder: "speedwagon.tasks.TaskBuilder",
-        job_args: TaskArgs
+        job_args: BatchTaskArgs
     ) -> None:
-        """Create a checksum validation task."""
-        filename = job_args['filename']
-        file_path = job_args['path']
-        expected_hash = job_args['expected_hash']
-        source_report = job_args['source_report']
+        """Create a checksum validation task for a batch of files."""
         task_builder.add_subtask(
-            ValidateChecksumTask(file_name=filename,
-                                 file_path=file_path,
-                                 expected_hash=expected_hash,
-                                 source_report=source_report))
+            ValidateChecksumBatchTask(files=job_args['files'])
+        )
 
     @classmethod
     def generate_report(
         cls,
-        results: List[speedwagon.tasks.Result[ValidateChecksumTaskResult]],
+        results: List[
+            speedwagon.tasks.Result[
+                Union[
+                    ValidateChecksumTaskResult,
+                    List[ValidateChecksumTaskResult]
+                ]
+            ]
+        ],
         user_args: ChecksumWorkflowJobArgs  # pylint: disable=unused-argument
     ) -> Optional[str]:
         """Generate a report for files failed checksum test."""
-        def validation_result_filter(
-            task_result: speedwagon.tasks.Result[ValidateChecksumTaskResult]
-        ) -> bool:
-            if task_result.source != ValidateChecksumTask:
-                return False
-            return True
+        validation_results: List[ValidateChecksumTaskResult] = []
+        for result in results:
+            if result.source is ValidateChecksumBatchTask:
+                validation_results += typing.cast(
+                    List[ValidateChecksumTaskResult], result.data
+                )
+            elif result.source is ValidateChecksumTask:
+                validation_results.append(
+                    typing.cast(ValidateChecksumTaskResult, result.data)
+                )
 
         line_sep = "\n" + "-" * 60
+        # Usually every file passes, so only group the results by report
+        # when there is a failure to list.
         results_with_failures = cls.find_failed(
-            cls._sort_results(
-                map(lambda x: x.data,
-                    filter(validation_result_filter, results))
-            )
-        )
+            cls._sort_results(validation_results)
+        ) if any(not it["valid"] for it in validation_results) else {}
 
         if len(results_with_failures) > 0:
             messages = []
@@ -202,7 +235,8 @@ class ChecksumWorkflow(Workflow[ChecksumWorkflowJobArgs]):
             report = f"\n{line_sep}\n".join(messages)
 
         else:
-            stats_message = f"All {len(results)} passed checksum validation."
+            stats_message = \
+                f"All {len(validation_results)} passed checksum validation."
             failure_list = ""
             report = f"Success" \
                      f"\n{stats_message}" \
@@ -245,16 +279,11 @@ class ChecksumWorkflow(Workflow[ChecksumWorkflowJobArgs]):
             DefaultDict[str, List[ValidateChecksumTaskResult]] = \
             collections.defaultdict(list)
 
-        sorted_results = sorted(results,
-                                key=lambda it:
-                                it["checksum_report_file"])
-        for key, value in itertools.groupby(
-                sorted_results,
-                key=lambda it: it["checksum_report_file"]):
-
-            for result_data in value:
-                new_results[key].append(result_data)
-        return dict(new_results)
+        for result_data in results:
+            new_results[result_data["checksum_report_file"]].append(
+                result_data
+            )
+        return dict(sorted(new_results.items()))
 
 
 class ReadChecksumReportTask(
@@ -269,19 +298,18 @@ class ReadChecksumReportTask(
         return f"Reading {self._checksum_file}"
 
     def work(self) -> bool:
-        results = []
-
-        checksums = hathi_validate.process.extracts_checksums(
-            self._checksum_file)
-
-        for report_md5_hash, filename in checksums:
-            new_job_to_do: ReadChecksumTaskReport = {
+        checksum_file = self._checksum_file
+        path = os.path.dirname(checksum_file)
+        results: List[ReadChecksumTaskReport] = [
+            {
                 "expected_hash": report_md5_hash,
                 "filename": filename,
-                "path": os.path.dirname(self._checksum_file),
-                "source_report": self._checksum_file
+                "path": path,
+                "source_report": checksum_file
             }
-            results.append(new_job_to_do)
+            for report_md5_hash, filename in
+            hathi_validate.process.extracts_checksums(checksum_file)
+        ]
         self.set_results(results)
         return True
 
@@ -306,38 +334,110 @@ class ValidateChecksumTask(
         return f"Validating checksum for {self._file_name}"
 
     def work(self) -> bool:
-        self.log(f"Validating {self._file_name}")
+        self.set_results(
+            validate_checksum(
+                self._file_name,
+                self._file_path,
+                self._expected_hash,
+                self._source_report,
+                self.log
+            )
+        )
+        return True
 
-        actual_md5 = hathi_validate.process.calculate_md5(
-            os.path.join(self._file_path, self._file_name))
 
-        standard_comparison = CaseSensitiveComparison()
-        valid_but_warnable_strategy = CaseInsensitiveComparison()
+class ValidateChecksumBatchTask(
+    speedwagon.tasks.Subtask[List[ValidateChecksumTaskResult]]
+):
+    name = "Validating File Checksums"
 
-        if standard_comparison.compare(actual_md5, self._expected_hash):
-            is_valid = True
+    def __init__(self, files: List[ChecksumWorkflow.TaskArgs]) -> None:
+        super().__init__()
+        self._files = files
 
-        elif valid_but_warnable_strategy.compare(actual_md5,
-                                                 self._expected_hash):
-            is_valid = True
-            self.log(f"Hash for {self._file_name} is valid but is presented"
-                     f"in a different format than expected."
-                     f"Expected: {self._expected_hash}. Actual: {actual_md5}")
-        else:
-            self.log(f"Hash mismatch for {self._file_name}. "
-                     f"Expected: {self._expected_hash}. Actual: {actual_md5}")
-            is_valid = False
-        result: ValidateChecksumTaskResult = {
-            "filename": self._file_name,
-            "path": self._file_path,
-            "checksum_report_file": self._source_report,
-            "valid": is_valid
-        }
-        self.set_results(result)
+    def task_description(self) -> Optional[str]:
+        return f"Validating checksums for {len(self._files)} file(s)"
+
+    def work(self) -> bool:
+        # Files listed by more than one report are only hashed once
+        file_paths = list(dict.fromkeys(map(_checksum_file_path, self._files)))
+
+        # Hashing releases the GIL so the files in the batch are read and
+        # hashed at the same time.
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(VALIDATE_BATCH_SIZE, CHECKSUM_WORKERS)
+        ) as executor:
+            file_hashes = dict(
+                zip(file_paths, executor.map(calculate_file_hash, file_paths))
+            )
 
+        # Only files that do not match exactly are logged
+        results: List[ValidateChecksumTaskResult] = [
+            validate_checksum(
+                file["filename"],
+                file["path"],
+                file["expected_hash"],
+                file["source_report"],
+                self.log,
+                actual_md5=file_hashes[_checksum_file_path(file)]
+            )
+            for file in self._files
+        ]
+        self.log(f"Validated checksums for {len(results)} file(s)")
+        self.set_results(results)
         return True
 
 
+def _checksum_file_path(file: ChecksumWorkflow.TaskArgs) -> str:
+    return os.path.normpath(os.path.join(file["path"], file["filename"]))
+
+
+def validate_checksum(
+    filename: str,
+    path: str,
+    expected_hash: str,
+    source_report: str,
+    log: Callable[[str], None],
+    actual_md5: Optional[str] = None
+) -> ValidateChecksumTaskResult:
+    """Check that the hash of a file matches the expected value.
+
+    Hashes that only differ by case are considered valid but a message is
+    logged about them.
+
+    Args:
+        filename: Name of the file to check.
+        path: Directory containing the file.
+        expected_hash: Hash listed in the checksum report.
+        source_report: Checksum report listing the file.
+        log: Callback for messages about the result.
+        actual_md5: Hash of the file if it has already been calculated.
+
+    Returns:
+        Result of the validation.
+    """
+    if actual_md5 is None:
+        actual_md5 = calculate_file_hash(os.path.join(path, filename))
+
+    if _STANDARD_COMPARISON.compare(actual_md5, expected_hash):
+        is_valid = True
+    elif _VALID_BUT_WARNABLE_COMPARISON.compare(actual_md5, expected_hash):
+        is_valid = True
+        log(f"Hash for {filename} is valid but is presented"
+            f"in a different format than expected."
+            f"Expected: {expected_hash}. Actual: {actual_md5}")
+    else:
+        log(f"Hash mismatch for {filename}. "
+            f"Expected: {expected_hash}. Actual: {actual_md5}")
+        is_valid = False
+    return {
+        "filename": filename,
+        "path": path,
+        "checksum_report_file": source_report,
+        "valid": is_valid
+    }
+
+
 class AbsComparisonMethod(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
@@ -357,6 +457,11 @@ class CaseInsensitiveComparison(AbsComparisonMethod):
         return a.lower() == b.lower()
 
 
+# The comparisons hold no state so the same ones are used for every file.
+_STANDARD_COMPARISON = CaseSensitiveComparison()
+_VALID_BUT_WARNABLE_COMPARISON = CaseInsensitiveComparison()
+
+
 VerifyChecksumBatchSingleJobArgs = TypedDict(
     "VerifyChecksumBatchSingleJobArgs",
     {
@@ -461,8 +566,11 @@ class VerifyChecksumBatchSingleWorkflow(
         ]
 
         line_sep = "\n" + "-" * 60
-        sorted_results = cls.sort_results(results_data)
-        results_with_failures = cls.find_failed(sorted_results)
+        # Usually every file passes, so only group the results by report
+        # when there is a failure to list.
+        results_with_failures = cls.find_failed(
+            cls.sort_results(results_data)
+        ) if any(not it["valid"] for it in results_data) else {}
 
         if len(results_with_failures) > 0:
             messages = []
@@ -510,17 +618,11 @@ class VerifyChecksumBatchSingleWorkflow(
         new_results: DefaultDict[str, List[ValidateChecksumTaskResult]] = \
             collections.defaultdict(list)
 
-        sorted_results = sorted(
-            results, key=lambda it: it["checksum_report_file"]
-        )
-
-        for key, value in itertools.groupby(
-                sorted_results,
-                key=lambda it: it["checksum_report_file"]
-        ):
-            for result_data in value:
-                new_results[key].append(result_data)
-        return dict(new_results)
+        for result_data in results:
+            new_results[result_data["checksum_report_file"]].append(
+                result_data
+            )
+        return dict(sorted(new_results.items()))
 
     @classmethod
     def find_failed(
@@ -555,38 +657,13 @@ class ChecksumTask(speedwagon.tasks.Subtask[ValidateChecksumTaskResult]):
         return f"Calculating file checksum for {self._kwarg['filename']}"
 
     def work(self) -> bool:
-        filename = self._kwarg["filename"]
-
-        source_report = self._kwarg["source_report"]
-
-        expected = self._kwarg["expected_hash"]
-
-        checksum_path = self._kwarg["path"]
-
-        full_path = os.path.join(checksum_path, filename)
-        actual_md5: str = hathi_validate.process.calculate_md5(full_path)
-
-        standard_comparison = CaseSensitiveComparison()
-
-        valid_but_warnable_strategy = CaseInsensitiveComparison()
-
-        if standard_comparison.compare(actual_md5, expected):
-            is_valid = True
-        elif valid_but_warnable_strategy.compare(actual_md5, expected):
-            is_valid = True
-            self.log(f"Hash for {filename} is valid but is presented"
-                     f"in a different format than expected."
-                     f"Expected: {expected}. Actual: {actual_md5}")
-        else:
-            self.log(f"Hash mismatch for {filename}. "
-                     f"Expected: {expected}. Actual: {actual_md5}")
-            is_valid = False
-        result: ValidateChecksumTaskResult = {
-            "filename": filename,
-            "path": checksum_path,
-            "checksum_report_file": source_report,
-            "valid": is_valid
-        }
-
-        self.set_results(result)
+        self.set_results(
+            validate_checksum(
+                self._kwarg["filename"],
+                self._kwarg["path"],
+                self._kwarg["expected_hash"],
+                self._kwarg["source_report"],
+                self.log
+            )
+        )
         return True
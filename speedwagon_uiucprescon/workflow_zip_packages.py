@@ -1,16 +1,20 @@
 """Workflow for creating zip archives."""
 from __future__ import annotations
+import concurrent.futures
 import logging
 
 import os
-from typing import List, TYPE_CHECKING, Optional, Mapping, TypedDict
+from typing import (
+    Callable, List, TYPE_CHECKING, Optional, Mapping, TypedDict, Union
+)
 
 import hathizip.process
 import hathizip
 
 import speedwagon
-from speedwagon import reports, workflow, utils, validators
+from speedwagon import reports, workflow, validators
 from speedwagon.job import Workflow
+from speedwagon_uiucprescon import task_logging
 
 if TYPE_CHECKING:
     import sys
@@ -27,6 +31,11 @@ JobArgs = TypedDict("JobArgs", {
     "destination_path": str,
 })
 
+BatchJobArgs = TypedDict("BatchJobArgs", {
+    "source_paths": List[str],
+    "destination_path": str,
+})
+
 UserArgs = TypedDict(
     "UserArgs",
     {
@@ -36,6 +45,10 @@ UserArgs = TypedDict(
 )
 
 
+# Number of folders zipped together by a single task
+ZIP_BATCH_SIZE = 8
+
+
 class ZipPackagesWorkflow(Workflow[UserArgs]):
     """Zip Package workflow for Speedwagon."""
 
@@ -59,20 +72,17 @@ class ZipPackagesWorkflow(Workflow[UserArgs]):
         ],
         additional_data: Mapping[str, Never],  # pylint: disable=W0613
         user_args: UserArgs,
-    ) -> List[JobArgs]:
+    ) -> List[BatchJobArgs]:
         """Generate metadata need by task."""
         source = user_args["Source"]
         output = user_args["Output"]
 
-        job_requests: List[JobArgs] = []
-        for dir_ in filter(lambda x: x.is_dir(), os.scandir(source)):
-            job_requests.append(
-                JobArgs(
-                    source_path=dir_.path,
-                    destination_path=output
-                )
-            )
-        return job_requests
+        with os.scandir(source) as entries:
+            source_paths = [dir_.path for dir_ in entries if dir_.is_dir()]
+        return [{
+            "source_paths": source_paths[index:index + ZIP_BATCH_SIZE],
+            "destination_path": output
+        } for index in range(0, len(source_paths), ZIP_BATCH_SIZE)]
 
     def job_options(self) -> List[
         workflow.AbsOutputOptionDataType[workflow.UserDataType]
@@ -100,17 +110,19 @@ class ZipPackagesWorkflow(Workflow[UserArgs]):
     def create_new_task(
         self,
         task_builder: "speedwagon.tasks.TaskBuilder",
-        job_args: JobArgs
+        job_args: BatchJobArgs
     ) -> None:
-        """Create a Zip task."""
-        new_task = ZipTask(**job_args)
+        """Create a task for zipping a batch of folders."""
+        new_task = ZipBatchTask(**job_args)
         task_builder.add_subtask(new_task)
 
     @classmethod
     @reports.add_report_borders
     def generate_report(
         cls,
-        results: List[speedwagon.tasks.Result[str]],  # pylint: disable=W0613
+        results: List[  # pylint: disable=unused-argument
+            speedwagon.tasks.Result[Union[str, List[str]]]
+        ],
         user_args: UserArgs
     ) -> Optional[str]:
         """Generate report for all files added to zip file."""
@@ -121,6 +133,32 @@ class ZipPackagesWorkflow(Workflow[UserArgs]):
         return "Zipping complete. All files written to output location"
 
 
+def zip_folder(
+    source_path: str,
+    destination_path: str,
+    log: Callable[[str], None]
+) -> str:
+    """Zip a folder into the destination.
+
+    Args:
+        source_path: Folder to zip.
+        destination_path: Folder where the zip file is saved.
+        log: Callback for progress messages.
+
+    Returns:
+        Path to the zip file created.
+    """
+    log(f"Zipping {source_path}")
+    hathizip.process.compress_folder_inplace(
+        path=source_path,
+        dst=destination_path)
+
+    basename = os.path.basename(source_path)
+    newfile = os.path.join(destination_path, f"{basename}.zip")
+    log(f"Created {newfile}")
+    return newfile
+
+
 class ZipTask(speedwagon.tasks.Subtask[str]):
     name = "Zip Files"
 
@@ -139,16 +177,49 @@ class ZipTask(speedwagon.tasks.Subtask[str]):
 
     def work(self) -> bool:
         my_logger = logging.getLogger(hathizip.__name__)
-        my_logger.setLevel(logging.INFO)
-        with utils.log_config(my_logger, self.log):
-            self.log(f"Zipping {self._source_path}")
-            hathizip.process.compress_folder_inplace(
-                path=self._source_path,
-                dst=self._destination_path)
-
-            basename = os.path.basename(self._source_path)
-            newfile = os.path.join(self._destination_path, f"{basename}.zip")
-            self.log(f"Created {newfile}")
-            self.set_results(newfile)
+        with task_logging.logger_level(my_logger, logging.INFO):
+            with task_logging.thread_log_config(my_logger, self.log):
+                self.set_results(
+                    zip_folder(
+                        self._source_path, self._destination_path, self.log
+                    )
+                )
+
+        return True
+
+
+class ZipBatchTask(speedwagon.tasks.Subtask[List[str]]):
+    name = "Zip Folders"
+
+    def __init__(
+            self,
+            source_paths: List[str],
+            destination_path: str,
+    ) -> None:
+
+        super().__init__()
+        self._source_paths = source_paths
+        self._destination_path = destination_path
+
+    def task_description(self) -> Optional[str]:
+        return f"Zipping {len(self._source_paths)} folder(s)"
+
+    def _zip(self, source_path: str) -> str:
+        with task_logging.thread_log_config(
+            logging.getLogger(hathizip.__name__), self.log
+        ):
+            return zip_folder(source_path, self._destination_path, self.log)
+
+    def work(self) -> bool:
+        my_logger = logging.getLogger(hathizip.__name__)
+        with task_logging.logger_level(my_logger, logging.INFO):
+            # zlib releases the GIL while compressing so the folders in the
+            # batch are zipped at the same time.
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(ZIP_BATCH_SIZE, os.cpu_count() or 1)
+            ) as executor:
+                self.set_results(
+                    list(executor.map(self._zip, self._source_paths))
+                )
 
         return True
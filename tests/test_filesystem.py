@@ -0,0 +1,54 @@
+import os
+
+from speedwagon_uiucprescon import filesystem
+
+
+def test_walk_files_same_order_as_os_walk(tmp_path):
+    (tmp_path / "b" / "nested").mkdir(parents=True)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "root.txt").touch()
+    (tmp_path / "a" / "first.txt").touch()
+    (tmp_path / "b" / "second.txt").touch()
+    (tmp_path / "b" / "nested" / "third.txt").touch()
+    expected = [
+        os.path.join(root, file_name)
+        for root, _, files in os.walk(tmp_path)
+        for file_name in files
+    ]
+    found = [entry.path for entry in filesystem.walk_files(str(tmp_path))]
+    assert sorted(found) == sorted(expected)
+    assert found.index(str(tmp_path / "b" / "second.txt")) < \
+        found.index(str(tmp_path / "b" / "nested" / "third.txt"))
+
+
+def test_walk_files_filters(tmp_path):
+    (tmp_path / "skipped").mkdir()
+    (tmp_path / "skipped" / "image.tif").touch()
+    (tmp_path / "image.tif").touch()
+    (tmp_path / "notes.txt").touch()
+    found = filesystem.walk_files(
+        str(tmp_path),
+        include_file=lambda entry: entry.name.endswith(".tif"),
+        search_directory=lambda entry: entry.name != "skipped"
+    )
+    assert [entry.path for entry in found] == [str(tmp_path / "image.tif")]
+
+
+def test_walk_files_skips_unreadable_directories(monkeypatch, tmp_path):
+    (tmp_path / "unreadable").mkdir()
+    (tmp_path / "unreadable" / "hidden.txt").touch()
+    (tmp_path / "file.txt").touch()
+    scandir = os.scandir
+
+    def scandir_with_error(path):
+        if path == str(tmp_path / "unreadable"):
+            raise PermissionError(path)
+        return scandir(path)
+
+    monkeypatch.setattr(filesystem.os, "scandir", scandir_with_error)
+    found = [entry.path for entry in filesystem.walk_files(str(tmp_path))]
+    assert found == [str(tmp_path / "file.txt")]
+
+
+def test_walk_files_missing_root(tmp_path):
+    assert list(filesystem.walk_files(str(tmp_path / "missing"))) == []
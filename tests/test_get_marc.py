@@ -276,36 +276,69 @@ def test_955_added_to_tasks(unconfigured_workflow, identifier_type,
                             subdirectory, expected_identifier, volume):
 
     workflow, user_options = unconfigured_workflow
-    job_args = {
-        'directory': {
-            'value': subdirectory,
-            'type': identifier_type,
-        },
-        "enhancements": {"955": True},
-        'api_server': "https://www.fake.com",
-        'path': "/fake/path/to/item"
-    }
+    user_options["Add 955 field"] = True
+    user_options["Add 035 field"] = False
+    results = [
+        Mock(
+            data={
+                "success": True,
+                "identifier": expected_identifier,
+                "output": os.path.join("fake", subdirectory, "MARC.XML"),
+            }
+        )
+    ]
     mock_task_builder = Mock()
-    workflow.create_new_task(
+    workflow.completion_task(
         task_builder=mock_task_builder,
-        job_args=job_args
+        results=results,
+        user_args=user_options
     )
-    mock_task_builder.add_subtask.assert_called()
-    assert mock_task_builder.add_subtask.call_count == 2
-    tasks_generated = mock_task_builder.add_subtask.call_args_list
-    retrieval_task = tasks_generated[0][0][0]
+    assert mock_task_builder.add_subtask.call_count == 1
+    enhancement_task = mock_task_builder.add_subtask.call_args[0][0]
+    assert isinstance(
+        enhancement_task,
+        workflow_get_marc.MarcEnhancementBatchTask
+    )
+    assert enhancement_task.files == [
+        (
+            os.path.join("fake", subdirectory, "MARC.XML"),
+            subdirectory,
+            {"955": True, "035": False}
+        )
+    ]
 
-    assert \
-        isinstance(
-            retrieval_task,
-            workflow_get_marc.MarcGeneratorTask
-        ), f"tasks_generated = {retrieval_task}"
 
-    assert retrieval_task.identifier_type == identifier_type and \
-           retrieval_task.identifier == expected_identifier
+def test_no_enhancements_skips_completion_task(unconfigured_workflow):
+    workflow, user_options = unconfigured_workflow
+    user_options["Add 955 field"] = False
+    user_options["Add 035 field"] = False
+    mock_task_builder = Mock()
+    workflow.completion_task(
+        task_builder=mock_task_builder,
+        results=[
+            Mock(
+                data={
+                    "success": True,
+                    "identifier": "100",
+                    "output": os.path.join("fake", "100", "MARC.XML"),
+                }
+            )
+        ],
+        user_args=user_options
+    )
+    mock_task_builder.add_subtask.assert_not_called()
 
-    enhancement_task = tasks_generated[1][0][0]
-    assert enhancement_task.added_value == subdirectory
+
+def test_enhancement_batch_task_enhances_every_file(monkeypatch):
+    files = [
+        (f"dummy{i}.xml", str(i), {"955": True, "035": True})
+        for i in range(3)
+    ]
+    task = workflow_get_marc.MarcEnhancementBatchTask(files)
+    enhance_file = Mock(side_effect=[True, False, True])
+    monkeypatch.setattr(workflow_get_marc, "_enhance_file", enhance_file)
+    assert task.work() is False
+    assert [call.args[0] for call in enhance_file.call_args_list] == files
 
 
 SAMPLE_RECORD = """<record xmlns="http://www.loc.gov/MARC21/slim" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="http://www.loc.gov/MARC21/slim http://www.loc.gov/standards/marcxml/schema/MARC21slim.xsd">
@@ -531,6 +564,79 @@ def test_995_enhancement_task_formats_without_namespace_tags(
             "<ns0:"), f"File starts with <ns:0: \"{file_text[0:10]}...\""
 
 
+def _datafield_record(*tags):
+    ns = "http://www.loc.gov/MARC21/slim"
+    root = ET.Element(f"{{{ns}}}record")
+    ET.SubElement(root, f"{{{ns}}}leader")
+    for index, tag in enumerate(tags):
+        ET.SubElement(
+            root, f"{{{ns}}}datafield", tag=tag, id=f"existing{index}"
+        )
+    return ET.ElementTree(root)
+
+
+def _new_datafield(tag, field_id):
+    return ET.Element(
+        "{http://www.loc.gov/MARC21/slim}datafield", tag=tag, id=field_id
+    )
+
+
+def _datafield_order(root):
+    return [
+        (child.attrib["tag"], child.attrib["id"])
+        for child in root if "tag" in child.attrib
+    ]
+
+
+def test_redraw_tree_keeps_new_fields_with_same_tag_in_order():
+    tree = _datafield_record("010", "035", "245")
+    root = workflow_get_marc.EnhancementTask.redraw_tree(
+        tree,
+        _new_datafield("955", "new0"),
+        _new_datafield("035", "new1"),
+        _new_datafield("035", "new2"),
+    )
+    assert _datafield_order(root) == [
+        ("010", "existing0"),
+        ("035", "new1"),
+        ("035", "new2"),
+        ("035", "existing1"),
+        ("245", "existing2"),
+        ("955", "new0"),
+    ]
+
+
+def test_redraw_tree_puts_last_field_after_last_datafield():
+    tree = _datafield_record("010", "245")
+    ET.SubElement(
+        tree.getroot(), "{http://www.loc.gov/MARC21/slim}trailer"
+    )
+    root = workflow_get_marc.EnhancementTask.redraw_tree(
+        tree, _new_datafield("955", "new0")
+    )
+    assert [child.attrib.get("id") for child in root] == [
+        None, "existing0", "existing1", "new0", None
+    ]
+    assert root[-1].tag == "{http://www.loc.gov/MARC21/slim}trailer"
+
+
+def test_redraw_tree_sorts_unsorted_record():
+    tree = _datafield_record("245", "035", "010")
+    root = workflow_get_marc.EnhancementTask.redraw_tree(
+        tree,
+        _new_datafield("035", "new0"),
+        _new_datafield("035", "new1"),
+    )
+    assert _datafield_order(root) == [
+        ("010", "existing2"),
+        ("035", "new0"),
+        ("035", "new1"),
+        ("035", "existing1"),
+        ("245", "existing0"),
+    ]
+    assert root[0].tag == "{http://www.loc.gov/MARC21/slim}leader"
+
+
 def test_fail_on_server_connection(monkeypatch):
     task = workflow_get_marc.MarcGeneratorTask(
         identifier="99101026212205899",
@@ -548,6 +654,169 @@ def test_fail_on_server_connection(monkeypatch):
         task.work()
 
 
+def test_batch_fetch_task_skips_missing_records(monkeypatch):
+    def mock_get_record(self, ident):
+        if ident == "missing":
+            raise workflow_get_marc.RecordNotFound()
+        return SAMPLE_RECORD
+
+    monkeypatch.setattr(
+        workflow_get_marc.GetMarcBibId, "get_record", mock_get_record
+    )
+    task = workflow_get_marc.MarcBatchFetchTask(
+        folders={"/fake/100": "100", "/fake/missing": "missing"},
+        identifier_type="Bibid",
+        server_url="http://fake.com"
+    )
+    assert task.work() is True
+    assert task.results == {
+        "/fake/100": SAMPLE_RECORD,
+        "/fake/missing": None
+    }
+
+
+def test_batch_fetch_task_unexpected_error_is_missing_record(monkeypatch):
+    def mock_get_record(self, ident):
+        if ident == "bad":
+            raise ValueError("unexpected response")
+        return SAMPLE_RECORD
+
+    monkeypatch.setattr(
+        workflow_get_marc.GetMarcBibId, "get_record", mock_get_record
+    )
+    task = workflow_get_marc.MarcBatchFetchTask(
+        folders={"/fake/100": "100", "/fake/bad": "bad"},
+        identifier_type="Bibid",
+        server_url="http://fake.com"
+    )
+    assert task.work() is True
+    assert task.results == {"/fake/100": SAMPLE_RECORD, "/fake/bad": None}
+
+
+def test_batch_fetch_task_fetches_shared_identifier_once(monkeypatch):
+    get_record = Mock(return_value=SAMPLE_RECORD)
+    monkeypatch.setattr(
+        workflow_get_marc.GetMarcMMSID, "get_record", get_record
+    )
+    task = workflow_get_marc.MarcBatchFetchTask(
+        folders={
+            "/fake/99101026212205899_1": "99101026212205899",
+            "/fake/99101026212205899_2": "99101026212205899",
+        },
+        identifier_type="MMS ID",
+        server_url="http://fake.com"
+    )
+    assert task.work() is True
+    get_record.assert_called_once_with("99101026212205899")
+    assert task.results == {
+        "/fake/99101026212205899_1": SAMPLE_RECORD,
+        "/fake/99101026212205899_2": SAMPLE_RECORD,
+    }
+
+
+def test_initial_task_passes_folders_to_fetch_task(
+        unconfigured_workflow, monkeypatch
+):
+    workflow, user_options = unconfigured_workflow
+    user_options["Identifier type"] = "MMS ID"
+    user_options["Input"] = "/fakepath"
+    workflow.filter_bib_id_folders = Mock(return_value=True)
+
+    def get_data(*args, **kwargs):
+        first = Mock(path="/fakepath/99101026212205899_1")
+        first.name = "99101026212205899_1"
+        return [first]
+
+    monkeypatch.setattr(os, 'scandir', get_data)
+    task_builder = Mock()
+    workflow.initial_task(task_builder, user_options)
+    task = task_builder.add_subtask.call_args[0][0]
+    assert task.folders == {
+        "/fakepath/99101026212205899_1": "99101026212205899"
+    }
+
+
+def test_discover_task_metadata_uses_prefetched_records(
+        unconfigured_workflow, monkeypatch
+):
+    workflow, user_options = unconfigured_workflow
+    user_options["Identifier type"] = "MMS ID"
+    user_options["Input"] = "/fakepath"
+    scandir = Mock()
+    monkeypatch.setattr(os, 'scandir', scandir)
+    jobs = workflow.discover_task_metadata(
+        [
+            speedwagon.tasks.Result(
+                None, data={"/fakepath/99101026212205899_1": "<xml/>"}
+            )
+        ],
+        None,
+        user_options
+    )
+    scandir.assert_not_called()
+    assert jobs[0]["record"] == "<xml/>"
+    assert jobs[0]["path"] == "/fakepath/99101026212205899_1"
+    assert jobs[0]["directory"]["value"] == "99101026212205899_1"
+
+
+def _marc_task(output_name):
+    return workflow_get_marc.MarcGeneratorTask(
+        identifier="100",
+        identifier_type="Bibid",
+        output_name=output_name,
+        server_url="http://fake.com",
+    )
+
+
+def test_write_file_leaves_matching_file(monkeypatch, tmp_path):
+    output = tmp_path / "MARC.XML"
+    output.write_bytes(b"<record/>")
+    monkeypatch.setattr(workflow_get_marc, "COMPARE_CHUNK_SIZE", 2)
+    with patch("builtins.open", wraps=open) as opened:
+        _marc_task(str(output)).write_file(b"<record/>")
+    assert [call.args[1] for call in opened.call_args_list] == ["rb"]
+    assert output.read_bytes() == b"<record/>"
+
+
+@pytest.mark.parametrize(
+    "existing",
+    [None, b"<old/>", b"<recorD/>"],
+    ids=["missing", "different size", "same size"]
+)
+def test_write_file_replaces_changed_file(monkeypatch, tmp_path, existing):
+    output = tmp_path / "MARC.XML"
+    if existing is not None:
+        output.write_bytes(existing)
+    monkeypatch.setattr(workflow_get_marc, "COMPARE_CHUNK_SIZE", 2)
+    _marc_task(str(output)).write_file("<record/>")
+    assert output.read_bytes() == b"<record/>"
+
+
+def test_write_file_does_not_read_file_of_different_size(tmp_path):
+    output = tmp_path / "MARC.XML"
+    output.write_bytes(b"<old/>")
+    with patch("builtins.open", wraps=open) as opened:
+        _marc_task(str(output)).write_file(b"<record/>")
+    assert [call.args[1] for call in opened.call_args_list] == ["wb"]
+
+
+def test_task_with_record_does_not_download(monkeypatch):
+    task = workflow_get_marc.MarcGeneratorTask(
+        identifier="100",
+        identifier_type="Bibid",
+        output_name="dummy.xml",
+        server_url="http://fake.com",
+        record=SAMPLE_RECORD
+    )
+    get = Mock()
+    monkeypatch.setattr(requests, "get", get)
+    monkeypatch.setattr(task, "log", Mock())
+    task.write_file = Mock()
+    assert task.work() is True
+    get.assert_not_called()
+    task.write_file.assert_called_once()
+
+
 def test_955_and_035_is_valid(monkeypatch, unconfigured_workflow):
     workflow, user_options = unconfigured_workflow
     user_options['Input'] = "/valid"
@@ -691,44 +960,70 @@ def test_035_enhancement_task_adds_035(monkeypatch, identifier_type,
 
 
 enhancement_tasks = [
-    (False, False, 1),
-    (True, False, 2),
-    (True, True, 3)
+    (False, False, None),
+    (True, False, {"955": True, "035": False}),
+    (True, True, {"955": True, "035": True})
 ]
 
 
-@pytest.mark.parametrize("e955, e035, expected_number_tasks_created",
+@pytest.mark.parametrize("e955, e035, expected_enhancements",
                          enhancement_tasks)
 def test_create_task_enhancements(
         unconfigured_workflow,
         e955: bool,
         e035: bool,
-        expected_number_tasks_created: int
+        expected_enhancements
 ):
 
     workflow, user_options = unconfigured_workflow
+    user_options["Add 955 field"] = e955
+    user_options["Add 035 field"] = e035
     subdirectory = "99101026212205899"
-    identifier_type = "MMS ID"
-    job_args = {
-        'directory': {
-            'value': subdirectory,
-            'type': identifier_type,
-        },
-        'api_server': "https://www.fake.com",
-        'path': "/fake/path/to/item",
-        "enhancements": {
-            "955": e955,
-            "035": e035,
-        },
-    }
     mock_task_builder = Mock()
     workflow.create_new_task(
         task_builder=mock_task_builder,
-        job_args=job_args
+        job_args={
+            'directory': {
+                'value': subdirectory,
+                'type': "MMS ID",
+            },
+            'api_server': "https://www.fake.com",
+            'path': os.path.join("fake", subdirectory),
+        }
+    )
+    assert mock_task_builder.add_subtask.call_count == 1
+    assert isinstance(
+        mock_task_builder.add_subtask.call_args[0][0],
+        workflow_get_marc.MarcGeneratorTask
     )
-    mock_task_builder.add_subtask.assert_called()
-    assert mock_task_builder.add_subtask.call_count == \
-           expected_number_tasks_created
+
+    mock_task_builder = Mock()
+    workflow.completion_task(
+        task_builder=mock_task_builder,
+        results=[
+            Mock(
+                data={
+                    "success": True,
+                    "identifier": subdirectory,
+                    "output": os.path.join(
+                        "fake", subdirectory, "MARC.XML"
+                    ),
+                }
+            )
+        ],
+        user_args=user_options
+    )
+    if expected_enhancements is None:
+        mock_task_builder.add_subtask.assert_not_called()
+        return
+    enhancement_task = mock_task_builder.add_subtask.call_args[0][0]
+    assert enhancement_task.files == [
+        (
+            os.path.join("fake", subdirectory, "MARC.XML"),
+            subdirectory,
+            expected_enhancements
+        )
+    ]
 
 
 sample_user_args = [
@@ -740,10 +1035,6 @@ sample_user_args = [
                 {
                     'type': 'MMS ID', 'value': '12345'
                 },
-            'enhancements':
-                {
-                    '955': True
-                }
         }
      ),
     (
@@ -754,11 +1045,6 @@ sample_user_args = [
                 {
                     'type': 'MMS ID', 'value': '12345'
                 },
-            'enhancements':
-                {
-                    '955': True,
-                    '035': True
-                }
         }
      )
 ]
@@ -792,19 +1078,7 @@ def test_discover_task_metadata(monkeypatch, unconfigured_workflow, arg_subdir,
         )
     assert len(t_md) == 1
     actual = t_md[0]
-    top_level_keys = [
-        k for k, v in expected.items() if not isinstance(v, dict)
-    ]
-    enhancement_keys = [
-        k for k, v in expected['enhancements'].items() if not isinstance(v,
-                                                                         dict)
-    ]
-    assert \
-        all([actual[x] == expected[x] for x in top_level_keys]) and \
-        all([
-                actual['enhancements'][x] == expected['enhancements'][x]
-                for x in enhancement_keys
-            ]), \
+    assert all([actual[x] == expected[x] for x in expected]), \
         f"Expected {expected}, Got {actual}"
 
 
@@ -882,7 +1156,8 @@ def test_catching_unicode_error(monkeypatch):
         workflow_get_marc.MarcEnhancement955Task(
             added_value="added_value",
             xml_file="xml_file"
-        )
+        ),
+        workflow_get_marc.MarcEnhancementBatchTask(files=[])
     ]
 )
 def test_tasks_have_description(task):
@@ -7,7 +7,7 @@ import pytest
 from uiucprescon import packager
 from uiucprescon.packager.packages.collection import Package
 from speedwagon_uiucprescon.workflow_hathi_limited_to_dl_compound import \
-    HathiLimitedToDLWorkflow, PackageConverter
+    HathiLimitedToDLWorkflow, BatchedPackageConverter
 
 
 @pytest.fixture(scope="module")
@@ -152,13 +152,16 @@ def test_finding_if_input_not_exist(monkeypatch):
     )
     assert findings["Input"] == ["Input does not exist"]
 
-class TestPackageConverter:
-    def test_transform_is_called(self):
-        source = Package("some_source")
-        task = PackageConverter(source, "out")
-        task.output_packager.transform = Mock()
+class TestBatchedPackageConverter:
+    def test_transform_is_called(self, monkeypatch):
+        sources = [Package("some_source"), Package("other_source")]
+        task = BatchedPackageConverter(sources, "out")
+        task.log = Mock()
+        monkeypatch.setattr(task.output_packager, "transform", Mock())
         task.work()
-        task.output_packager.transform.assert_called_with(source, "out")
+        task.output_packager.transform.assert_any_call(sources[0], "out")
+        task.output_packager.transform.assert_any_call(sources[1], "out")
+        assert len(task.results) == 2
 
 
 options = [
@@ -178,8 +181,8 @@ def test_hathi_limited_to_dl_compound_has_options(index, label):
 class TestHathiLimitedToDLWorkflow:
     def test_report(self):
         results = [
-            Mock(),
-            Mock(),
+            Mock(data=[{"destination": "dummy"}]),
+            Mock(data=[{"destination": "dummy"}]),
         ]
         report = HathiLimitedToDLWorkflow.generate_report(
             results=results,
@@ -191,7 +194,7 @@ class TestHathiLimitedToDLWorkflow:
         workflow = HathiLimitedToDLWorkflow()
         task_builder = Mock()
         args = {
-            "package": Mock(),
+            "packages": [Mock()],
             "destination": Mock()
         }
         workflow.create_new_task(task_builder, args)
@@ -218,4 +221,24 @@ class TestHathiLimitedToDLWorkflow:
             user_args=user_args
         )
         assert task_metadata[0]["destination"] == user_args['Output'] and \
-               'package' in task_metadata[0]
+               len(task_metadata[0]['packages']) == 1
+
+    def test_discover_task_metadata_batches_packages(self, monkeypatch):
+        workflow = HathiLimitedToDLWorkflow()
+        user_args = {
+            "Input": "source",
+            "Output": "dest"
+        }
+
+        def locate_packages(_, path):
+            return [Mock() for _ in range(10)]
+        monkeypatch.setattr(
+            packager.packages.HathiLimitedView,
+            "locate_packages", locate_packages
+        )
+        task_metadata = workflow.discover_task_metadata(
+            initial_results=[],
+            additional_data=[],
+            user_args=user_args
+        )
+        assert [len(job['packages']) for job in task_metadata] == [8, 2]
@@ -42,27 +42,30 @@ def test_discover_task_metadata(monkeypatch, unconfigured_workflow,
     additional_data = {}
     number_of_fake_images = 10
 
-    def mock_locate_source_files(self, root):
+    def mock_locate_source_entries(root):
         for i_number in range(number_of_fake_images):
-            file_name = f"99423682912205899-{str(i_number).zfill(8)}.tif"
-            yield os.path.join(root, file_name)
+            entry = Mock()
+            entry.name = f"99423682912205899-{str(i_number).zfill(8)}.tif"
+            entry.path = os.path.join(root, entry.name)
+            yield entry
 
     with monkeypatch.context() as mp:
-        mp.setattr(profile, "locate_source_files",
-                   mock_locate_source_files)
+        mp.setattr(profile, "locate_source_entries",
+                   mock_locate_source_entries)
         new_task_md = workflow.discover_task_metadata(
             initial_results=initial_results,
             additional_data=additional_data,
             user_args=user_options
         )
 
-    assert len(new_task_md) == number_of_fake_images
+    assert len(new_task_md) == 1
+    assert len(new_task_md[0]['files']) == number_of_fake_images
     assert all(
         x['source_root'] == user_options['Input'] for x in new_task_md
     ) and all(
         x['destination_root'] == user_options['Output'] for x in new_task_md
     ) and all(
-        x['new_file_name'].endswith(".jp2") for x in new_task_md
+        x['new_file_name'].endswith(".jp2") for x in new_task_md[0]['files']
     )
 
 
@@ -73,11 +76,15 @@ def test_create_new_task_generates_subtask(unconfigured_workflow, profile):
     mock_builder = Mock()
     job_args = {
         'source_root': "/some/source/package",
-        'source_file': "123.tif",
         'destination_root': "/some/destination",
-        "new_file_name": "123.jp2",
         "relative_location": ".",
         "image_factory": profile.image_factory,
+        "files": [
+            {
+                'source_file': "123.tif",
+                "new_file_name": "123.jp2",
+            }
+        ]
     }
     workflow.create_new_task(
         mock_builder,
@@ -94,6 +101,35 @@ def test_create_new_task_generates_subtask(unconfigured_workflow, profile):
            )
 
 
+def test_create_new_task_ensures_path_once_per_directory(
+        unconfigured_workflow
+):
+    workflow, _ = unconfigured_workflow
+    mock_builder = Mock()
+    job_args = {
+        'source_root': "/some/source/package",
+        'destination_root': "/some/destination",
+        "relative_location": "access",
+        "image_factory": "HathiTrust JPEG 2000",
+        "files": [
+            {'source_file': "1.tif", "new_file_name": "1.jp2"},
+            {'source_file': "2.tif", "new_file_name": "2.jp2"},
+            {'source_file': "3.tif", "new_file_name": "3.jp2"},
+        ]
+    }
+    workflow.create_new_task(mock_builder, job_args)
+    added = [
+        call_args[0][0]
+        for call_args in mock_builder.add_subtask.call_args_list
+    ]
+    assert [type(task) for task in added] == [
+        workflow_make_jp2.EnsurePathTask,
+        workflow_make_jp2.ConvertFileTask,
+        workflow_make_jp2.ConvertFileTask,
+        workflow_make_jp2.ConvertFileTask,
+    ]
+
+
 def test_generate_report_creates_a_report(unconfigured_workflow):
     workflow, user_options = unconfigured_workflow
     results = [
@@ -130,13 +166,13 @@ def test_package_naming_convention_task(monkeypatch):
 
 
 @pytest.mark.parametrize("profile_name", ["HathiTrust", "Digital Library"])
-def test_create_jp2(monkeypatch, profile_name):
+def test_create_jp2(monkeypatch, tmp_path, profile_name):
     import pykdu_compress
     workflow = workflow_make_jp2.MakeJp2Workflow()
     initial_results = []
     additional_data = {}
     user_args = {
-        'Input': "some_source_path",
+        'Input': str(tmp_path),
         "Output": "somepath",
         "Profile": profile_name
     }
@@ -144,28 +180,21 @@ def test_create_jp2(monkeypatch, profile_name):
         "12345_1.tif",
         "12345_2.tif"
     ]
-
-    def mock_walk(root):
-        return [
-            ("12345", ['access'], tuple(files_in_package))
-        ]
-
-    def mock_scandir(path):
-        for file_name in files_in_package:
-            file_mock = Mock()
-            file_mock.name = file_name
-            file_mock.path = os.path.join(path, file_name)
-            yield file_mock
-
-    with monkeypatch.context() as mp:
-        mp.setattr(os, "walk", mock_walk)
-        mp.setattr(os, "scandir", mock_scandir)
-        tasks_md = workflow.discover_task_metadata(
-            initial_results=initial_results,
-            additional_data=additional_data,
-            user_args=user_args
-        )
+    access_dir = tmp_path / "12345" / "access"
+    access_dir.mkdir(parents=True)
+    for file_name in files_in_package:
+        (access_dir / file_name).touch()
+
+    tasks_md = workflow.discover_task_metadata(
+        initial_results=initial_results,
+        additional_data=additional_data,
+        user_args=user_args
+    )
     assert len(tasks_md) > 0
+    assert all(
+        task_md["relative_location"] == os.path.join("12345", "access")
+        for task_md in tasks_md
+    )
     working_dir = 'some_working_path'
     task_builder = speedwagon.tasks.TaskBuilder(
         speedwagon.tasks.MultiStageTaskBuilder(working_dir),
@@ -351,3 +380,43 @@ class TestMakeJp2Workflow:
         assert findings['Output'] == [
             f"{os.path.join('some', 'output','file.txt')} is not a directory"
         ]
+
+
+def test_locate_source_files_does_not_search_access_dirs(tmp_path):
+    (tmp_path / "first" / "access" / "access").mkdir(parents=True)
+    (tmp_path / "first" / "access" / "1.tif").touch()
+    (tmp_path / "first" / "access" / "access" / "2.tif").touch()
+    (tmp_path / "second" / "nested" / "access").mkdir(parents=True)
+    (tmp_path / "second" / "nested" / "3.tif").touch()
+    (tmp_path / "second" / "nested" / "access" / "4.tif").touch()
+    found = workflow_make_jp2.DigitalLibraryProfile().locate_source_files(
+        str(tmp_path)
+    )
+    assert sorted(found) == [
+        os.path.join(str(tmp_path), "first", "access", "1.tif"),
+        os.path.join(str(tmp_path), "second", "nested", "access", "4.tif"),
+    ]
+
+
+def test_locate_source_files_only_finds_tifs(tmp_path):
+    access_dir = tmp_path / "12345" / "access"
+    access_dir.mkdir(parents=True)
+    (access_dir / "12345_1.tif").touch()
+    (access_dir / "12345_2.TIF").touch()
+    (access_dir / "12345_3.jp2").touch()
+    (access_dir / "folder.tif").mkdir()
+    found = workflow_make_jp2.HathiTrustProfile().locate_source_files(
+        str(tmp_path)
+    )
+    assert sorted(os.path.basename(path) for path in found) == [
+        "12345_1.tif", "12345_2.TIF"
+    ]
+
+
+def test_ensure_path_task_allows_existing_directory(tmp_path):
+    task = workflow_make_jp2.EnsurePathTask(path=str(tmp_path / "new"))
+    task.log = Mock()
+    assert task.work() is True
+    assert task.work() is True
+    assert (tmp_path / "new").is_dir()
+    assert task.log.call_count == 1
@@ -22,32 +22,19 @@ class TestZipPackagesWorkflow:
 
     def test_discover_task_metadata(
             self,
-            monkeypatch,
+            tmp_path,
             workflow,
             default_options
     ):
         import os
         user_args = default_options.copy()
-        user_args["Input"] = os.path.join("some", "source")
+        user_args["Input"] = str(tmp_path)
+        (tmp_path / "something").mkdir()
+        (tmp_path / "something" / "some_file.txt").touch()
 
         initial_results = []
         additional_data = {}
 
-        def scandir(root):
-            results = [
-                Mock(path=os.path.join(root, "something"))
-            ]
-            return results
-        #
-
-        def walk(root):
-            results = [
-                (root, (), ("some_file.txt", ))
-            ]
-            for f in results:
-                yield f
-        monkeypatch.setattr(workflow_make_checksum.os, "scandir", scandir)
-        monkeypatch.setattr(workflow_make_checksum.os, "walk", walk)
         task_metadata = \
             workflow.discover_task_metadata(
                 initial_results=initial_results,
@@ -59,16 +46,40 @@ class TestZipPackagesWorkflow:
             len(task_metadata) == 1 and \
             task_metadata[0]['source_path'] == os.path.join(
                     user_args["Input"], "something") and \
-            task_metadata[0]['filename'] == "some_file.txt" and \
+            task_metadata[0]['filenames'] == ["some_file.txt"] and \
             task_metadata[0]['save_to_filename'] == os.path.join(
                 user_args["Input"], "something", "checksum.md5"
             )
 
+    def test_discover_task_metadata_includes_subdirectories(
+            self,
+            tmp_path,
+            workflow,
+            default_options
+    ):
+        import os
+        user_args = default_options.copy()
+        user_args["Input"] = str(tmp_path)
+        (tmp_path / "something" / "nested").mkdir(parents=True)
+        (tmp_path / "something" / "some_file.txt").touch()
+        (tmp_path / "something" / "nested" / "other_file.txt").touch()
+
+        task_metadata = workflow.discover_task_metadata(
+            initial_results=[],
+            additional_data={},
+            user_args=user_args
+        )
+        assert sorted(task_metadata[0]['filenames']) == [
+            os.path.join("nested", "other_file.txt"),
+            "some_file.txt"
+        ]
+
     def test_create_new_task(self, workflow, monkeypatch):
         import os
         job_args = {
             "source_path": os.path.join("some", "source", "path"),
-            "filename": "some_file.txt",
+            "filenames": ["some_file.txt"],
+            "algorithm": "md5",
             'save_to_filename':
                 os.path.join(
                     "some",
@@ -79,33 +90,36 @@ class TestZipPackagesWorkflow:
                 )
         }
         task_builder = Mock()
-        MakeChecksumTask = Mock()
-        MakeChecksumTask.name = "MakeChecksumTask"
+        MakeChecksumBatchTask = Mock()
+        MakeChecksumBatchTask.name = "MakeChecksumBatchTask"
         monkeypatch.setattr(
             tasks,
-            "MakeChecksumTask",
-            MakeChecksumTask
+            "MakeChecksumBatchTask",
+            MakeChecksumBatchTask
         )
 
         workflow.create_new_task(task_builder, job_args)
 
         assert task_builder.add_subtask.called is True
-        assert MakeChecksumTask.called is True
+        assert MakeChecksumBatchTask.called is True
 
-        MakeChecksumTask.assert_called_with(
+        MakeChecksumBatchTask.assert_called_with(
             job_args['source_path'],
-            "some_file.txt",
-            job_args['save_to_filename']
+            ["some_file.txt"],
+            job_args['save_to_filename'],
+            algorithm="md5"
         )
 
     def test_generate_report(self, workflow, default_options):
         user_args = default_options.copy()
         results = [
             speedwagon.tasks.Result(
-                tasks.MakeChecksumTask,
-                {
-                    "checksum_file": "checksum.md5"
-                }
+                tasks.MakeChecksumBatchTask,
+                [
+                    {
+                        "checksum_file": "checksum.md5"
+                    }
+                ]
             )
         ]
         report = workflow.generate_report(results=results, user_args=user_args)
@@ -116,15 +130,59 @@ class TestZipPackagesWorkflow:
         task_builder = Mock()
         results = [
             speedwagon.tasks.Result(
-                tasks.MakeChecksumTask,
-                {
-                    "checksum_file": "checksum.md5"
-                }
+                tasks.MakeChecksumBatchTask,
+                [
+                    {
+                        "checksum_file": "checksum.md5"
+                    }
+                ]
             )
         ]
         workflow.completion_task(task_builder, results, user_args)
         assert task_builder.add_subtask.called is True
 
+    def test_discover_task_metadata_batches_files(
+            self,
+            tmp_path,
+            workflow,
+            default_options
+    ):
+        user_args = default_options.copy()
+        user_args["Input"] = str(tmp_path)
+        (tmp_path / "something").mkdir()
+        for i in range(70):
+            (tmp_path / "something" / f"file_{i}.txt").touch()
+
+        task_metadata = workflow.discover_task_metadata(
+            initial_results=[],
+            additional_data={},
+            user_args=user_args
+        )
+        assert [len(job['filenames']) for job in task_metadata] == [64, 6]
+
+    def test_discover_task_metadata_uses_algorithm(
+            self,
+            tmp_path,
+            workflow,
+            default_options
+    ):
+        import os
+        user_args = default_options.copy()
+        user_args["Input"] = str(tmp_path)
+        user_args["Algorithm"] = "sha256"
+        (tmp_path / "something").mkdir()
+        (tmp_path / "something" / "some_file.txt").touch()
+
+        task_metadata = workflow.discover_task_metadata(
+            initial_results=[],
+            additional_data={},
+            user_args=user_args
+        )
+        assert task_metadata[0]['algorithm'] == "sha256"
+        assert task_metadata[0]['save_to_filename'] == os.path.join(
+            str(tmp_path), "something", "checksum.sha256"
+        )
+
 
 class TestRegenerateChecksumBatchSingleWorkflow:
     @pytest.fixture
@@ -142,39 +200,18 @@ class TestRegenerateChecksumBatchSingleWorkflow:
 
     def test_discover_task_metadata(
             self,
-            monkeypatch,
+            tmp_path,
             workflow,
             default_options
     ):
         import os
         user_args = default_options.copy()
-        user_args["Input"] = os.path.join("some", "source")
+        user_args["Input"] = os.path.join(str(tmp_path), "checksum.md5")
+        (tmp_path / "some_file.txt").touch()
 
         initial_results = []
         additional_data = {}
 
-        def scandir(root):
-            results = [
-                Mock(path=os.path.join(root, "something"))
-            ]
-            return results
-        #
-
-        def walk(root):
-            results = [
-                (root, (), ("some_file.txt", ))
-            ]
-            for f in results:
-                yield f
-        monkeypatch.setattr(workflow_make_checksum.os, "scandir", scandir)
-        monkeypatch.setattr(workflow_make_checksum.os, "walk", walk)
-
-        monkeypatch.setattr(
-            workflow_make_checksum.os.path,
-            "samefile",
-            lambda a, b: False
-        )
-
         task_metadata = \
             workflow.discover_task_metadata(
                 initial_results=initial_results,
@@ -182,10 +219,9 @@ class TestRegenerateChecksumBatchSingleWorkflow:
                 user_args=user_args
             )
         assert len(task_metadata) == 1 and \
-               task_metadata[0]['source_path'] == "some" and \
+               task_metadata[0]['source_path'] == str(tmp_path) and \
                task_metadata[0]['filename'] == "some_file.txt" and \
-               task_metadata[0]['save_to_filename'] == os.path.join(
-                    "some", "source")
+               task_metadata[0]['save_to_filename'] == user_args["Input"]
 
     def test_create_new_task(self, workflow, monkeypatch):
         import os
@@ -277,39 +313,20 @@ class TestRegenerateChecksumBatchMultipleWorkflow:
 
     def test_discover_task_metadata(
             self,
-            monkeypatch,
+            tmp_path,
             workflow,
             default_options
     ):
         import os
         user_args = default_options.copy()
-        user_args["Input"] = os.path.join("some", "source")
+        user_args["Input"] = str(tmp_path)
+        (tmp_path / "something").mkdir()
+        (tmp_path / "something" / "some_file.txt").touch()
+        (tmp_path / "something" / "checksum.md5").touch()
 
         initial_results = []
         additional_data = {}
 
-        def scandir(root):
-            results = [
-                Mock(path=os.path.join(root, "something"))
-            ]
-            return results
-        #
-
-        def walk(root):
-            results = [
-                (root, (), ("some_file.txt", ))
-            ]
-            for f in results:
-                yield f
-        monkeypatch.setattr(workflow_make_checksum.os, "scandir", scandir)
-        monkeypatch.setattr(workflow_make_checksum.os, "walk", walk)
-
-        monkeypatch.setattr(
-            workflow_make_checksum.os.path,
-            "samefile",
-            lambda a, b: False
-        )
-
         task_metadata = \
             workflow.discover_task_metadata(
                 initial_results=initial_results,
@@ -321,7 +338,7 @@ class TestRegenerateChecksumBatchMultipleWorkflow:
                    user_args["Input"], "something") and \
                task_metadata[0]['filename'] == "some_file.txt" and \
                task_metadata[0]['save_to_filename'] == os.path.join(
-                    "some", "source", "something", "checksum.md5")
+                    user_args["Input"], "something", "checksum.md5")
 
     def test_create_new_task(self, workflow, monkeypatch):
         import os
@@ -397,3 +414,31 @@ class TestRegenerateChecksumBatchMultipleWorkflow:
         assert MakeCheckSumReportTask.called is True
 
         MakeCheckSumReportTask.assert_called_with("checksum.md5", ANY)
+
+
+def test_sort_results_groups_by_checksum_file():
+    results = [
+        {"source_filename": "b.txt", "checksum_hash": "2",
+         "checksum_file": "second.md5"},
+        {"source_filename": "a.txt", "checksum_hash": "1",
+         "checksum_file": "first.md5"},
+        {"source_filename": "c.txt", "checksum_hash": "3",
+         "checksum_file": "second.md5"},
+    ]
+    sorted_results = \
+        workflow_make_checksum.CreateChecksumWorkflow.sort_results(results)
+    assert list(sorted_results) == ["first.md5", "second.md5"]
+    assert [
+        result["source_filename"] for result in sorted_results["second.md5"]
+    ] == ["b.txt", "c.txt"]
+
+
+def test_locate_files_returns_dir_entries(tmp_path):
+    (tmp_path / "some_file.txt").write_bytes(b"some data")
+    entries = list(
+        workflow_make_checksum.CreateChecksumWorkflow.locate_files(
+            str(tmp_path)
+        )
+    )
+    assert [entry.name for entry in entries] == ["some_file.txt"]
+    assert entries[0].stat().st_size == 9
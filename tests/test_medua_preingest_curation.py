@@ -41,76 +41,140 @@ class TestMedusaPreingestCuration:
         with pytest.raises(ValueError):
             workflow.sort_item_data(data)
 
-    def test_sort_item_data(self, workflow, monkeypatch):
+    def test_sort_item_data(self, workflow, tmp_path):
+        (tmp_path / "file.txt").touch()
+        (tmp_path / "directory").mkdir()
         data = [
-            "./some/file.txt",
-            "./some/directory/",
+            str(tmp_path / "file.txt"),
+            str(tmp_path / "directory"),
         ]
-        monkeypatch.setattr(
-            workflow_medusa_preingest.os.path,
-            "isdir",
-            lambda path: path == "./some/directory/",
-        )
-        monkeypatch.setattr(
-            workflow_medusa_preingest.os.path,
-            "isfile",
-            lambda path: path == "./some/file.txt",
-        )
         results = workflow.sort_item_data(data)
         assert results == {
-            "files": ["./some/file.txt"],
-            "directories": ["./some/directory/"],
+            "files": [str(tmp_path / "file.txt")],
+            "directories": [str(tmp_path / "directory")],
         }
 
-    def test_discover_task_metadata(self, workflow, default_args, monkeypatch):
+    def test_discover_task_metadata(self, workflow, default_args, tmp_path):
         initial_results = []
 
-        removal_files = ["somefile.txt"]
-        removal_dirs = ["somedir", "nested_path"]
-        nested_dirs = [os.path.join("nested_path", "a")]
-
-        def isfile(path):
-            return path in removal_files
+        (tmp_path / "somefile.txt").touch()
+        (tmp_path / "somedir").mkdir()
+        (tmp_path / "nested_path").mkdir()
+        (tmp_path / "nested_path" / "a").touch()
 
-        def isdir(path):
-            return path in removal_dirs
+        removal_files = [str(tmp_path / "somefile.txt")]
+        removal_dirs = [
+            str(tmp_path / "somedir"), str(tmp_path / "nested_path")
+        ]
+        nested_files = [str(tmp_path / "nested_path" / "a")]
 
-        def iterdir(self):
-            if self.name == "nested_path":
-                return [pathlib.Path(a) for a in nested_dirs]
-            return []
+        new_tasks = workflow.discover_task_metadata(
+            initial_results,
+            additional_data={
+                "to remove": removal_files + removal_dirs + nested_files
+            },
+            user_args=default_args,
+        )
 
-        def is_dir(self):
-            return self.name in removal_dirs or self.name == os.path.join(
-                "nested_path", "a"
-            )
+        file_batch, *directory_tasks = new_tasks
+        assert file_batch["type"] == "file_batch"
+        assert sorted(file_batch["paths"]) == sorted(
+            removal_files + nested_files
+        )
+        assert directory_tasks == [
+            {"type": "directory", "path": str(tmp_path / "somedir")},
+            {"type": "directory", "path": str(tmp_path / "nested_path")},
+        ]
 
-        def is_file(self):
-            return self.name in removal_files + ["a"]
+    def test_discover_task_metadata_lists_items_once(
+        self, workflow, default_args, tmp_path
+    ):
+        (tmp_path / "parent" / "child").mkdir(parents=True)
+        (tmp_path / "parent" / "child" / "a").touch()
+        new_tasks = workflow.discover_task_metadata(
+            [],
+            additional_data={
+                "to remove": [
+                    str(tmp_path / "parent" / "child"),
+                    str(tmp_path / "parent") + os.sep,
+                    str(tmp_path / "parent"),
+                ]
+            },
+            user_args=default_args,
+        )
+        assert new_tasks == [
+            {
+                "type": "file_batch",
+                "paths": [str(tmp_path / "parent" / "child" / "a")]
+            },
+            {"type": "directory", "path": str(tmp_path / "parent" / "child")},
+            {"type": "directory", "path": str(tmp_path / "parent")},
+        ]
 
-        monkeypatch.setattr(workflow_medusa_preingest.os.path, "isdir", isdir)
-        monkeypatch.setattr(
-            workflow_medusa_preingest.os.path, "isfile", isfile
+    def test_discover_task_metadata_removes_symlinks_as_files(
+        self, workflow, default_args, tmp_path
+    ):
+        (tmp_path / "target").mkdir()
+        (tmp_path / "CaptureOne").mkdir()
+        link = tmp_path / "CaptureOne" / "link"
+        try:
+            link.symlink_to(tmp_path / "target", target_is_directory=True)
+        except OSError:
+            pytest.skip("Unable to create symlinks")
+        new_tasks = workflow.discover_task_metadata(
+            [],
+            additional_data={"to remove": [str(tmp_path / "CaptureOne")]},
+            user_args=default_args,
         )
-        monkeypatch.setattr(workflow_medusa_preingest.Path, "iterdir", iterdir)
-        monkeypatch.setattr(workflow_medusa_preingest.Path, "is_dir", is_dir)
-        monkeypatch.setattr(workflow_medusa_preingest.Path, "is_file", is_file)
+        assert new_tasks == [
+            {"type": "file_batch", "paths": [str(link)]},
+            {"type": "directory", "path": str(tmp_path / "CaptureOne")},
+        ]
 
+    def test_discover_task_metadata_normalizes_file_paths(
+        self, workflow, default_args, tmp_path
+    ):
+        (tmp_path / "a").touch()
         new_tasks = workflow.discover_task_metadata(
-            initial_results,
+            [],
             additional_data={
-                "to remove": removal_files + removal_dirs + nested_dirs
+                "to remove": [os.path.join(str(tmp_path), ".", "a")]
             },
             user_args=default_args,
         )
+        assert new_tasks == [
+            {"type": "file_batch", "paths": [str(tmp_path / "a")]}
+        ]
 
-        assert all(
-            new_task in new_tasks
-            for new_task in [
-                {"type": "file", "path": "somefile.txt"},
-                {"type": "directory", "path": "somedir"},
-            ]
+    def test_discover_task_metadata_skips_missing_items(
+        self, workflow, default_args, tmp_path
+    ):
+        new_tasks = workflow.discover_task_metadata(
+            [],
+            additional_data={"to remove": [str(tmp_path / "missing")]},
+            user_args=default_args,
+        )
+        assert new_tasks == []
+
+    def test_discover_task_metadata_batches_files(
+        self, workflow, default_args, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(
+            workflow_medusa_preingest, "DELETE_BATCH_SIZE", 2
+        )
+        removal_files = []
+        for name in "abcde":
+            (tmp_path / name).touch()
+            removal_files.append(str(tmp_path / name))
+
+        new_tasks = workflow.discover_task_metadata(
+            [],
+            additional_data={"to remove": removal_files},
+            user_args=default_args,
         )
+        assert [task["paths"] for task in new_tasks] == [
+            removal_files[0:2], removal_files[2:4], removal_files[4:]
+        ]
 
     def test_get_additional_info_opens_dialog(
         self,
@@ -130,6 +194,10 @@ class TestMedusaPreingestCuration:
     @pytest.mark.parametrize(
         "job_args, expected_class",
         [
+            (
+                {"type": "file_batch", "paths": ["somefile"]},
+                workflow_medusa_preingest.DeleteFiles,
+            ),
             (
                 {"type": "file", "path": "somefile"},
                 filesystem_tasks.DeleteFile,
@@ -169,6 +237,65 @@ class TestMedusaPreingestCuration:
         report = workflow.generate_report(results=results, user_args=default_args)
         assert "some_file" in report
 
+    def test_generate_report_mentions_batched_files(
+        self, workflow, default_args
+    ):
+        results = [
+            Mock(
+                spec=speedwagon.tasks.Result,
+                source=workflow_medusa_preingest.DeleteFiles,
+                data=["first_file", "second_file"],
+            )
+        ]
+        report = workflow.generate_report(
+            results=results, user_args=default_args
+        )
+        assert "first_file" in report and "second_file" in report
+
+
+def test_delete_files_removes_every_path(tmp_path):
+    paths = [str(tmp_path / "._a"), str(tmp_path / ".DS_Store")]
+    for path in paths:
+        pathlib.Path(path).touch()
+    task = workflow_medusa_preingest.DeleteFiles(paths)
+    task.log = Mock()
+    assert task.work() is True
+    assert task.results == paths
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_delete_files_skips_missing_files(tmp_path):
+    existing = tmp_path / "._a"
+    existing.touch()
+    missing = str(tmp_path / ".DS_Store")
+    task = workflow_medusa_preingest.DeleteFiles([missing, str(existing)])
+    task.log = Mock()
+    assert task.work() is True
+    assert task.results == [str(existing)]
+    assert not existing.exists()
+
+
+def test_delete_files_records_removed_before_error(tmp_path, monkeypatch):
+    paths = [str(tmp_path / "first"), str(tmp_path / "second")]
+    for path in paths:
+        pathlib.Path(path).touch()
+    unlink = os.unlink
+
+    def unlink_with_error(path):
+        if path == paths[1]:
+            raise PermissionError(path)
+        unlink(path)
+
+    monkeypatch.setattr(
+        workflow_medusa_preingest.os, "unlink", unlink_with_error
+    )
+    task = workflow_medusa_preingest.DeleteFiles(paths)
+    task.log = Mock()
+    with pytest.raises(PermissionError):
+        task.work()
+    assert task.results == [paths[0]]
+    task.log.assert_called_with(f"Deleted before the error:\n{paths[0]}")
+
 
 @pytest.fixture()
 def default_user_args():
@@ -435,58 +562,40 @@ def test_find_capture_one_data_nothing_found(monkeypatch):
     assert not items_found
 
 
-def test_find_capture_one_data_found(monkeypatch):
-    starting_point = "."
-    monkeypatch.setattr(
-        workflow_medusa_preingest.os.path,
-        "exists",
-        lambda path: path == os.path.join(starting_point, "CaptureOne"),
-    )
-
-    def walk(top, *args, **kwargs):
-        return [
-            [top, (["Cache", "Settings91"]), ([])],
-            [os.path.join(top, "Cache"), (), (["someFile"])],
-        ]
+def test_find_capture_one_data_found(tmp_path):
+    capture_one = tmp_path / "CaptureOne"
+    (capture_one / "Cache").mkdir(parents=True)
+    (capture_one / "Settings91").mkdir()
+    (capture_one / "Cache" / "someFile").touch()
 
-    monkeypatch.setattr(workflow_medusa_preingest.os, "walk", walk)
     items_found = list(
         workflow_medusa_preingest.find_capture_one_data(
-            directory=starting_point
+            directory=str(tmp_path)
         )
     )
-    assert items_found == [
-        os.path.join(starting_point, "CaptureOne", "Cache"),
-        os.path.join(starting_point, "CaptureOne", "Settings91"),
-        os.path.join(starting_point, "CaptureOne", "Cache", "someFile"),
-        os.path.join(starting_point, "CaptureOne"),
-    ]
+    assert sorted(items_found) == sorted([
+        str(capture_one / "Cache"),
+        str(capture_one / "Settings91"),
+        str(capture_one / "Cache" / "someFile"),
+        str(capture_one),
+    ])
+    assert items_found.index(str(capture_one / "Cache" / "someFile")) < \
+        items_found.index(str(capture_one / "Cache"))
+    assert items_found[-1] == str(capture_one)
 
 
 class TestFilesystemItemLocator:
-    def test_locate_contents_order(self, monkeypatch):
-        files = {
-            "starting_point": [
-                pathlib.Path("starting_point/empty_path"),
-                pathlib.Path("starting_point/nested_path/file1.txt"),
-                pathlib.Path("starting_point/nested_path/file2.txt"),
-                pathlib.Path("starting_point/nested_path"),
-                pathlib.Path("starting_point/dummy.txt"),
-            ],
-        }
-
-        def iterdir(self):
-            return files[str(self)]
-
-        monkeypatch.setattr(
-            workflow_medusa_preingest.os.path,
-            "exists",
-            lambda path: path in files,
-        )
+    def test_locate_contents_order(self, tmp_path):
+        starting_point = tmp_path / "starting_point"
+        (starting_point / "empty_path").mkdir(parents=True)
+        (starting_point / "nested_path").mkdir()
+        (starting_point / "nested_path" / "file1.txt").touch()
+        (starting_point / "nested_path" / "file2.txt").touch()
+        (starting_point / "dummy.txt").touch()
 
-        monkeypatch.setattr(workflow_medusa_preingest.Path, "iterdir", iterdir)
         locator = workflow_medusa_preingest.FilesystemItemLocator()
-        assert set(locator.locate("starting_point")) == {
+        located = list(locator.locate(str(starting_point)))
+        assert set(located) == {
             "empty_path",
             os.path.join("nested_path", "file2.txt"),
             os.path.join("nested_path", "file1.txt"),
@@ -494,3 +603,55 @@ class TestFilesystemItemLocator:
             "dummy.txt",
             os.path.join("."),
         }
+        assert located.index(os.path.join("nested_path", "file1.txt")) < \
+            located.index("nested_path")
+        assert located[-1] == "."
+
+
+@pytest.mark.parametrize(
+    "name, is_dir, expected_valid",
+    [
+        ("CaptureOne", True, False),
+        ("CaptureOne", False, True),
+        ("somefile.tif", True, True),
+    ]
+)
+def test_capture_one_checker(name, is_dir, expected_valid):
+    path = Mock(spec_set=pathlib.Path, is_dir=Mock(return_value=is_dir))
+    path.name = name
+    checker = workflow_medusa_preingest.CaptureOneChecker()
+    assert checker.is_valid(path) is expected_valid
+
+
+def test_capture_one_checker_only_checks_matching_names():
+    path = Mock(spec_set=pathlib.Path, is_dir=Mock(return_value=True))
+    path.name = "somefile.tif"
+    workflow_medusa_preingest.CaptureOneChecker().is_valid(path)
+    assert path.is_dir.called is False
+
+
+@pytest.mark.parametrize(
+    "name, is_dir, expected_offending",
+    [
+        (".DS_Store", False, True),
+        (".DS_Store.txt", False, False),
+        ("Thumbs.db", False, True),
+        ("thumbs.db", False, False),
+        ("._sample.tif", False, True),
+        ("sample._tif", False, False),
+        ("CaptureOne", True, True),
+        ("CaptureOne", False, False),
+        ("sample.tif", False, False),
+    ]
+)
+def test_offending_path_decider_with_all_checkers(
+    name, is_dir, expected_offending
+):
+    decider = workflow_medusa_preingest.OffendingPathDecider()
+    decider.add_checker(workflow_medusa_preingest.CaptureOneChecker())
+    decider.add_checker(workflow_medusa_preingest.DotUnderScoreChecker())
+    decider.add_checker(workflow_medusa_preingest.DsStoreChecker())
+    decider.add_checker(workflow_medusa_preingest.ThumbsDbChecker())
+    path = Mock(spec_set=pathlib.Path, is_dir=Mock(return_value=is_dir))
+    path.name = name
+    assert decider.is_offending(path) is expected_offending
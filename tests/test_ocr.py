@@ -1,4 +1,5 @@
 import itertools
+import sys
 from unittest.mock import MagicMock, Mock, ANY, mock_open, patch
 
 import pytest
@@ -250,60 +251,92 @@ class TestOCRWorkflow:
             file_extension=expected_file_extension
         )
 
-    def test_get_available_languages(self, workflow, monkeypatch):
-        path = "tessdir"
+    def test_get_available_languages(self, workflow, tmp_path):
+        (tmp_path / "eng.traineddata").touch()
+        (tmp_path / "readme.txt").touch()
+        languages = list(workflow.get_available_languages(str(tmp_path)))
+        assert languages == ["eng"]
 
-        def scandir(path):
-            results = []
-            m = Mock()
-            m.name = "eng.traineddata"
-            m.path = os.path.join(path, m.name)
-            results.append(m)
-            return results
+    def test_get_available_languages_ignores_osd(self, workflow, tmp_path):
+        (tmp_path / "osd.traineddata").touch()
+        (tmp_path / "eng.traineddata").touch()
+        languages = list(workflow.get_available_languages(str(tmp_path)))
+        assert languages == ["eng"]
 
-        monkeypatch.setattr(workflow_ocr.os, "scandir", scandir)
-        languages = list(workflow.get_available_languages(path))
-        assert len(languages) == 1
 
-    def test_get_available_languages_ignores_osd(self, workflow, monkeypatch):
-        path = "tessdir"
-
-        def scandir(path):
-            results = []
-            osd = Mock()
-            osd.name = "osd.traineddata"
-            osd.path = os.path.join(path, osd.name)
-            results.append(osd)
-
-            eng = Mock()
-            eng.name = "eng.traineddata"
-            eng.path = os.path.join(path, eng.name)
-            results.append(eng)
-            return results
-
-        monkeypatch.setattr(workflow_ocr.os, "scandir", scandir)
-        languages = list(workflow.get_available_languages(path))
-        assert len(languages) == 1
+@pytest.mark.parametrize(
+    "file_names, expected",
+    [
+        (["eng.traineddata"], True),
+        (["readme.txt"], False),
+        ([], False),
+    ]
+)
+def test_path_contains_traineddata(tmp_path, file_names, expected):
+    for file_name in file_names:
+        (tmp_path / file_name).touch()
+    assert workflow_ocr.path_contains_traineddata(str(tmp_path)) is expected
 
 
 class TestFindImagesTask:
-    def test_work(self, monkeypatch):
-        root = os.path.join("some", "directory")
+    def test_work(self, tmp_path):
+        root = tmp_path / "directory"
+        (root / "12345" / "access").mkdir(parents=True)
+        (root / "12345" / "sample.jp2").touch()
+        (root / "12345" / "sample.txt").touch()
+        (root / "12345" / "access" / "other.JP2").touch()
         file_extension = ".jp2"
         task = workflow_ocr.FindImagesTask(
-            root=root,
+            root=str(root),
             file_extension=file_extension
         )
 
-        def walk(path):
-            return [
-                ("12345", ('access'), ('sample.jp2', "sample.txt"))
-            ]
-
-        monkeypatch.setattr(workflow_ocr.os, "walk", walk)
         assert task.work() is True
-        assert os.path.join("12345", "sample.jp2") in task.results and \
-               os.path.join("12345", "sample.txt") not in task.results
+        assert str(root / "12345" / "sample.jp2") in task.results and \
+               str(root / "12345" / "sample.txt") not in task.results
+        assert str(root / "12345" / "access" / "other.JP2") in task.results
+
+    def test_work_skips_metadata_directories(self, tmp_path):
+        (tmp_path / "CaptureOne").mkdir()
+        (tmp_path / "CaptureOne" / "cached.jp2").touch()
+        (tmp_path / ".hidden").mkdir()
+        (tmp_path / ".hidden" / "hidden.jp2").touch()
+        (tmp_path / "sample.jp2").touch()
+        task = workflow_ocr.FindImagesTask(
+            root=str(tmp_path),
+            file_extension=".jp2"
+        )
+        task.log = Mock()
+        task.work()
+        assert task.results == [str(tmp_path / "sample.jp2")]
+
+    def test_work_searches_hidden_directories_if_enabled(
+        self, tmp_path, monkeypatch
+    ):
+        (tmp_path / ".hidden").mkdir()
+        (tmp_path / ".hidden" / "hidden.jp2").touch()
+        monkeypatch.setattr(
+            workflow_ocr.FindImagesTask, "skip_hidden_directories", False
+        )
+        task = workflow_ocr.FindImagesTask(
+            root=str(tmp_path),
+            file_extension=".jp2"
+        )
+        task.log = Mock()
+        task.work()
+        assert task.results == [str(tmp_path / ".hidden" / "hidden.jp2")]
+
+    def test_work_logs_total_once(self, tmp_path):
+        (tmp_path / "a.jp2").touch()
+        (tmp_path / "b.jp2").touch()
+        task = workflow_ocr.FindImagesTask(
+            root=str(tmp_path),
+            file_extension=".jp2"
+        )
+        task.log = Mock()
+        task.work()
+        task.log.assert_called_with("Located 2 .jp2 file(s)")
+        assert task.log.call_count == 2
 
 
 class TestGenerateOCRFileTask:
@@ -346,6 +379,82 @@ class TestGenerateOCRFileTask:
         task.read_image(source_image, "eng")
         assert reader.read.called is True
 
+    def test_read_image_reuses_reader(self, monkeypatch):
+        engine = Mock(data_set_path="reused_tesspath")
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask, "engine", engine
+        )
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask,
+            "_readers",
+            workflow_ocr._ThreadReaders()
+        )
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask, "set_tess_path", Mock()
+        )
+        task = workflow_ocr.GenerateOCRFileTask(
+            source_image="sample.jp2",
+            out_text_file="sample.txt",
+            lang="eng",
+            tesseract_path="reused_tesspath"
+        )
+        task.log = Mock()
+        task.read_image("sample.jp2", "eng")
+        task.read_image("sample2.jp2", "eng")
+        engine.get_reader.assert_called_once_with("eng")
+
+    def test_read_image_new_reader_for_new_engine(self, monkeypatch):
+        engine = Mock(data_set_path="first_tesspath")
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask, "engine", engine
+        )
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask,
+            "_readers",
+            workflow_ocr._ThreadReaders()
+        )
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask, "set_tess_path", Mock()
+        )
+        task = workflow_ocr.GenerateOCRFileTask(
+            source_image="sample.jp2",
+            out_text_file="sample.txt",
+            lang="eng",
+        )
+        task.log = Mock()
+        task.read_image("sample.jp2", "eng")
+        new_engine = Mock(data_set_path="second_tesspath")
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask, "engine", new_engine
+        )
+        task.read_image("sample.jp2", "eng")
+        new_engine.get_reader.assert_called_once_with("eng")
+
+    def test_read_image_reader_per_thread(self, monkeypatch):
+        import concurrent.futures
+        engine = Mock(data_set_path="tesspath")
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask, "engine", engine
+        )
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask,
+            "_readers",
+            workflow_ocr._ThreadReaders()
+        )
+        monkeypatch.setattr(
+            workflow_ocr.GenerateOCRFileTask, "set_tess_path", Mock()
+        )
+        task = workflow_ocr.GenerateOCRFileTask(
+            source_image="sample.jp2",
+            out_text_file="sample.txt",
+            lang="eng",
+        )
+        task.log = Mock()
+        task.read_image("sample.jp2", "eng")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(task.read_image, "sample.jp2", "eng").result()
+        assert engine.get_reader.call_count == 2
+
 
 @pytest.mark.parametrize(
     "task",
@@ -364,3 +473,47 @@ class TestGenerateOCRFileTask:
 )
 def test_tasks_have_description(task):
     assert task.task_description() is not None
+
+
+def test_get_language_code():
+    assert workflow_ocr.get_language_code("English") == "eng"
+
+
+def test_get_language_code_unknown_language():
+    with pytest.raises(ValueError):
+        workflow_ocr.get_language_code("Not a language")
+
+
+def test_capture_stderr_includes_native_output():
+    with workflow_ocr._capture_stderr(native=True) as messages:
+        os.write(2, b"native warning\n")
+        print("python warning", file=sys.stderr)
+    assert "native warning" in messages.getvalue()
+    assert "python warning" in messages.getvalue()
+
+
+def test_capture_stderr_native_blocks_other_threads():
+    import concurrent.futures
+    with workflow_ocr._capture_stderr(native=True):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            acquired = executor.submit(
+                workflow_ocr._STDERR_LOCK.acquire, blocking=False
+            ).result()
+    assert acquired is False
+
+
+def test_capture_stderr_does_not_block_other_threads_by_default():
+    import concurrent.futures
+
+    def try_lock():
+        if not workflow_ocr._STDERR_LOCK.acquire(blocking=False):
+            return False
+        workflow_ocr._STDERR_LOCK.release()
+        return True
+
+    with workflow_ocr._capture_stderr() as messages:
+        print("python warning", file=sys.stderr)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            acquired = executor.submit(try_lock).result()
+    assert acquired is True
+    assert "python warning" in messages.getvalue()
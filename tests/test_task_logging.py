@@ -0,0 +1,41 @@
+import logging
+import threading
+from unittest.mock import Mock
+
+from speedwagon_uiucprescon import task_logging
+
+
+def test_logger_level_restored_after_overlapping_contexts():
+    logger = logging.getLogger("test_logger_level_overlapping")
+    logger.setLevel(logging.WARNING)
+    first = task_logging.logger_level(logger, logging.INFO)
+    second = task_logging.logger_level(logger, logging.INFO)
+    first.__enter__()
+    second.__enter__()
+    first.__exit__(None, None, None)
+    assert logger.isEnabledFor(logging.INFO)
+    second.__exit__(None, None, None)
+    assert logger.level == logging.WARNING
+
+
+def test_logger_level_does_not_raise_level():
+    logger = logging.getLogger("test_logger_level_debug")
+    logger.setLevel(logging.DEBUG)
+    with task_logging.logger_level(logger, logging.INFO):
+        assert logger.level == logging.DEBUG
+    assert logger.level == logging.DEBUG
+
+
+def test_thread_log_config_ignores_other_threads():
+    logger = logging.getLogger("test_thread_log_config")
+    callback = Mock()
+    with task_logging.logger_level(logger, logging.INFO), \
+            task_logging.thread_log_config(logger, callback):
+        other_thread = threading.Thread(
+            target=logger.info, args=("from another task",)
+        )
+        other_thread.start()
+        other_thread.join()
+        logger.info("from this task")
+    assert [call.args[0] for call in callback.call_args_list] == \
+        ["from this task"]
@@ -94,3 +94,78 @@ def test_prep_task_task_calls_generate_package(monkeypatch):
 )
 def test_tasks_have_description(task):
     assert task.task_description() is not None
+
+
+def test_make_checksum_task_calculates_md5(tmp_path):
+    sample_file = tmp_path / "sample.txt"
+    sample_file.write_bytes(b"some data")
+    task = tasks.MakeChecksumTask(
+        source_path=str(tmp_path),
+        filename="sample.txt",
+        checksum_report=str(tmp_path / "checksum.md5")
+    )
+    task.log = Mock()
+    assert task.work() is True
+    assert task.results["checksum_hash"] == \
+        "1e50210a0202497fb79bc38b6ade6c34"
+
+
+@pytest.mark.parametrize("size", [0, 9, 256 * 1024 + 1])
+def test_calculate_file_hash_without_file_digest(tmp_path, monkeypatch, size):
+    import hashlib
+    from speedwagon_uiucprescon.tasks import validation
+    sample_file = tmp_path / "sample.bin"
+    data = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+    sample_file.write_bytes(data)
+    monkeypatch.delattr(validation.hashlib, "file_digest", raising=False)
+    assert validation.calculate_file_hash(str(sample_file)) == \
+        hashlib.md5(data).hexdigest()
+
+
+def test_make_checksum_batch_task_calculates_every_file(tmp_path):
+    (tmp_path / "first.txt").write_bytes(b"some data")
+    (tmp_path / "second.txt").write_bytes(b"")
+    task = tasks.MakeChecksumBatchTask(
+        source_path=str(tmp_path),
+        filenames=["first.txt", "second.txt"],
+        checksum_report=str(tmp_path / "checksum.md5")
+    )
+    task.log = Mock()
+    assert task.work() is True
+    assert [result["checksum_hash"] for result in task.results] == [
+        "1e50210a0202497fb79bc38b6ade6c34",
+        "d41d8cd98f00b204e9800998ecf8427e",
+    ]
+
+
+def test_make_checksum_batch_task_uses_algorithm(tmp_path):
+    (tmp_path / "first.txt").write_bytes(b"some data")
+    task = tasks.MakeChecksumBatchTask(
+        source_path=str(tmp_path),
+        filenames=["first.txt"],
+        checksum_report=str(tmp_path / "checksum.sha256"),
+        algorithm="sha256"
+    )
+    task.log = Mock()
+    assert task.work() is True
+    assert task.results[0]["checksum_hash"] == \
+        "1307990e6ba5ca145eb35e99182a9bec46531bc54ddf656a602c780fa0240dee"
+
+
+def test_get_profile_validator_is_shared():
+    from speedwagon_uiucprescon.tasks import validation
+    profile_name = "HathiTrust JPEG 2000"
+    assert validation.get_profile_validator(profile_name) is \
+        validation.get_profile_validator(profile_name)
+
+
+def test_get_profile_validator_is_per_thread():
+    import concurrent.futures
+    from speedwagon_uiucprescon.tasks import validation
+    profile_name = "HathiTrust JPEG 2000"
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread_validator = executor.submit(
+            validation.get_profile_validator, profile_name
+        ).result()
+    assert validation.get_profile_validator(profile_name) is not \
+        other_thread_validator
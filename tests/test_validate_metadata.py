@@ -125,28 +125,48 @@ class TestValidateMetadataWorkflow:
         )
         assert len(tasks_generated) == 1
         assert tasks_generated[0] == {
-            "filename": "spam.jp2",
+            "filenames": ["spam.jp2"],
             "profile_name": user_options["Profile"]
         }
 
+    def test_discover_task_metadata_batches_files(
+            self, workflow, default_options
+    ):
+        user_options = default_options.copy()
+        user_options['Profile'] = 'HathiTrust JPEG 2000'
+        batch_size = workflow_validate_metadata.VALIDATION_BATCH_SIZE
+        initial_results = [
+            speedwagon.tasks.Result(
+                workflow_validate_metadata.LocateImagesTask,
+                [f"{index}.jp2" for index in range(batch_size + 1)]
+            )
+        ]
+        tasks_generated = workflow.discover_task_metadata(
+            initial_results=initial_results,
+            additional_data={},
+            user_args=user_options
+        )
+        assert [len(job["filenames"]) for job in tasks_generated] == \
+            [batch_size, 1]
+
     def test_create_new_task(self, monkeypatch, workflow):
         job_args = {
-            "filename": "somefile.jp2",
+            "filenames": ["somefile.jp2"],
             "profile_name": 'HathiTrust JPEG 2000'
         }
         task_builder = Mock()
-        ValidateImageMetadataTask = Mock()
+        ValidateImageMetadataBatchTask = Mock()
         monkeypatch.setattr(
             tasks,
-            "ValidateImageMetadataTask",
-            ValidateImageMetadataTask
+            "ValidateImageMetadataBatchTask",
+            ValidateImageMetadataBatchTask
         )
 
         workflow.create_new_task(task_builder, job_args)
 
         assert task_builder.add_subtask.called is True
-        ValidateImageMetadataTask.assert_called_with(
-            job_args['filename'],
+        ValidateImageMetadataBatchTask.assert_called_with(
+            job_args['filenames'],
             job_args['profile_name']
         )
 
@@ -185,26 +205,48 @@ class TestValidateMetadataWorkflow:
         assert isinstance(report, str)
         assert "MyFailingFile.jp2" in report
 
+    def test_generate_report_batched(self, workflow, default_options):
+        user_options = default_options.copy()
+        user_options["Input"] = os.path.join("some", "valid", "path")
+        results = [
+            speedwagon.tasks.Result(
+                tasks.ValidateImageMetadataBatchTask,
+                [
+                    {"valid": True},
+                    {
+                        "valid": False,
+                        "filename": "MyFailingFile.jp2",
+                        "report": "spam.txt"
+                    }
+                ]
+            )
+        ]
+        report = workflow.generate_report(results, user_options)
+        assert "Total files checked: 2" in report
+        assert "MyFailingFile.jp2" in report
+
 
 class TestLocateImagesTask:
-    def test_work(self, monkeypatch):
-        root_path = os.path.join("some", "path")
-        profile_name = "HathiTrust JPEG 2000"
+    def test_work(self, tmp_path):
+        (tmp_path / "1222.jp2").touch()
+        (tmp_path / "111.jp2").touch()
+        (tmp_path / "notes.txt").touch()
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "nested" / "333.JP2").touch()
         task = workflow_validate_metadata.LocateImagesTask(
-            root=root_path,
-            profile_name=profile_name
+            root=str(tmp_path),
+            profile_name="HathiTrust JPEG 2000"
+        )
+        task.log = Mock()
+        assert task.work() is True
+        assert sorted(task.results) == sorted([
+            str(tmp_path / "1222.jp2"),
+            str(tmp_path / "111.jp2"),
+            str(tmp_path / "nested" / "333.JP2"),
+        ])
+        task.log.assert_called_once_with(
+            f"Found 3 image file(s) in {tmp_path}"
         )
-
-        def walk(root):
-            files = [
-                (root, (), ("1222.jp2", "111.jp2"))
-            ]
-            for item in files:
-                yield item
-        monkeypatch.setattr(os, "walk", walk)
-        assert \
-            task.work() is True and \
-            len(task.results) == 2
 
 
 class TestValidateImageMetadataTask:
@@ -233,6 +275,28 @@ class TestValidateImageMetadataTask:
             }
 
 
+class TestValidateImageMetadataBatchTask:
+    def test_work(self, monkeypatch):
+        from uiucprescon import imagevalidate
+
+        filenames = ["first.jp2", "second.jp2"]
+        task = tasks.ValidateImageMetadataBatchTask(
+            filenames=filenames,
+            profile_name="HathiTrust JPEG 2000"
+        )
+        task.log = Mock()
+
+        def validate(_, file_name):
+            report = imagevalidate.Report()
+            report.filename = file_name
+            return report
+
+        monkeypatch.setattr(imagevalidate.Profile, "validate", validate)
+        assert task.work() is True
+        assert [result["filename"] for result in task.results] == filenames
+        assert all(result["valid"] for result in task.results)
+
+
 @pytest.mark.parametrize(
     "task",
     [
@@ -240,6 +304,10 @@ class TestValidateImageMetadataTask:
             filename="filename",
             profile_name='HathiTrust JPEG 2000'
         ),
+        tasks.ValidateImageMetadataBatchTask(
+            filenames=["filename"],
+            profile_name='HathiTrust JPEG 2000'
+        ),
         workflow_validate_metadata.LocateImagesTask(
             root="root",
             profile_name='HathiTrust JPEG 2000'
@@ -150,17 +150,21 @@ class TestChecksumWorkflowTaskGenerators:
     def test_create_new_task(self, workflow, monkeypatch):
         task_builder = Mock()
         job_args = {
-            'filename': "some_real_file.txt",
-            'path': os.path.join("some", "real", "path"),
-            'expected_hash': "something",
-            'source_report': "something",
+            "files": [
+                {
+                    'filename': "some_real_file.txt",
+                    'path': os.path.join("some", "real", "path"),
+                    'expected_hash': "something",
+                    'source_report': "something",
+                }
+            ]
         }
-        ValidateChecksumTask = Mock()
+        ValidateChecksumBatchTask = Mock()
 
         monkeypatch.setattr(
             workflow_verify_checksums,
-            "ValidateChecksumTask",
-            ValidateChecksumTask
+            "ValidateChecksumBatchTask",
+            ValidateChecksumBatchTask
         )
         workflow.create_new_task(
             task_builder=task_builder,
@@ -168,12 +172,7 @@ class TestChecksumWorkflowTaskGenerators:
         )
         assert task_builder.add_subtask.called is True
 
-        ValidateChecksumTask.assert_called_with(
-            file_name=job_args['filename'],
-            file_path=job_args['path'],
-            expected_hash=job_args['expected_hash'],
-            source_report=job_args['source_report']
-        )
+        ValidateChecksumBatchTask.assert_called_with(files=job_args['files'])
 
 
 class TestChecksumWorkflow:
@@ -216,6 +215,102 @@ class TestChecksumWorkflow:
             user_args=user_args
         )
         assert len(job_metadata) == 1
+        assert job_metadata[0]["files"][0]["filename"] == "somefile.txt"
+
+    def test_discover_task_metadata_batches_files(
+        self, workflow, default_options, monkeypatch
+    ):
+        monkeypatch.setattr(
+            workflow_verify_checksums, "VALIDATE_BATCH_SIZE", 2
+        )
+        initial_results = [
+            speedwagon.tasks.Result(
+                source=workflow_verify_checksums.ReadChecksumReportTask,
+                data=[
+                    {
+                        'expected_hash': 'something',
+                        'filename': f"file{index}.txt",
+                        'path': os.path.join("some", "path"),
+                        'source_report': "checksums.md5"
+                    } for index in range(5)
+                ]
+            )
+        ]
+        job_metadata = workflow.discover_task_metadata(
+            initial_results=initial_results,
+            additional_data={},
+            user_args=default_options.copy()
+        )
+        assert [len(job["files"]) for job in job_metadata] == [2, 2, 1]
+
+    def test_discover_task_metadata_keeps_same_file_in_one_batch(
+        self, workflow, default_options, monkeypatch
+    ):
+        monkeypatch.setattr(
+            workflow_verify_checksums, "VALIDATE_BATCH_SIZE", 1
+        )
+        outer_entry = {
+            'expected_hash': 'something',
+            'filename': os.path.join("sub", "file.txt"),
+            'path': "root",
+            'source_report': os.path.join("root", "checksum.md5")
+        }
+        other_entry = {
+            'expected_hash': 'something',
+            'filename': "other.txt",
+            'path': "root",
+            'source_report': os.path.join("root", "checksum.md5")
+        }
+        inner_entry = {
+            'expected_hash': 'something',
+            'filename': "file.txt",
+            'path': os.path.join("root", "sub"),
+            'source_report': os.path.join("root", "sub", "checksum.md5")
+        }
+        initial_results = [
+            speedwagon.tasks.Result(
+                source=workflow_verify_checksums.ReadChecksumReportTask,
+                data=[outer_entry, other_entry]
+            ),
+            speedwagon.tasks.Result(
+                source=workflow_verify_checksums.ReadChecksumReportTask,
+                data=[inner_entry]
+            ),
+        ]
+        job_metadata = workflow.discover_task_metadata(
+            initial_results=initial_results,
+            additional_data={},
+            user_args=default_options.copy()
+        )
+        assert job_metadata == [
+            {"files": [outer_entry, inner_entry]},
+            {"files": [other_entry]},
+        ]
+
+    def test_generator_report_counts_batched_files(
+        self, workflow, default_options
+    ):
+        results = [
+            speedwagon.tasks.Result(
+                workflow_verify_checksums.ValidateChecksumBatchTask,
+                [
+                    {
+                        "valid": True,
+                        "checksum_report_file": "SomeFile.md5",
+                        "filename": "first.txt"
+                    },
+                    {
+                        "valid": True,
+                        "checksum_report_file": "SomeFile.md5",
+                        "filename": "second.txt"
+                    },
+                ]
+            )
+        ]
+        report = workflow.generate_report(
+            results=results, user_args=default_options
+        )
+        assert "All 2 passed checksum validation." in report
 
     def test_generator_report_failure(self, workflow, default_options):
         # result_enums = workflow_verify_checksums.ResultValues
@@ -249,6 +344,31 @@ class TestChecksumWorkflow:
         assert isinstance(report, str)
         assert "passed checksum validation" in report
 
+    def test_generator_report_success_skips_sorting(
+            self, workflow, default_options, monkeypatch
+    ):
+        sort_results = Mock()
+        monkeypatch.setattr(
+            workflow_verify_checksums.ChecksumWorkflow,
+            "_sort_results",
+            sort_results
+        )
+        results = [
+            speedwagon.tasks.Result(
+                workflow_verify_checksums.ValidateChecksumTask,
+                {
+                    "valid": True,
+                    "checksum_report_file": "SomeFile.md5",
+                    "filename": "somefile.txt"
+                }
+            )
+        ]
+        report = workflow.generate_report(
+            results=results, user_args=default_options
+        )
+        assert "All 1 passed checksum validation." in report
+        sort_results.assert_not_called()
+
     def test_locate_checksum_files(self, workflow, monkeypatch):
         def walk(root):
             return [
@@ -319,15 +439,73 @@ class TestValidateChecksumTask:
             expected_hash=expected_hash,
             source_report=source_report
         )
-        import hathi_validate
-
-        calculate_md5 = Mock(return_value=actual_hash)
+        calculate_file_hash = Mock(return_value=actual_hash)
         with monkeypatch.context() as mp:
-            mp.setattr(hathi_validate.process, "calculate_md5", calculate_md5)
+            mp.setattr(
+                workflow_verify_checksums,
+                "calculate_file_hash",
+                calculate_file_hash
+            )
             assert task.work() is True
             assert task.results["valid"] is should_be_valid
 
 
+class TestValidateChecksumBatchTask:
+    def test_work(self, tmp_path):
+        (tmp_path / "first.txt").write_bytes(b"some data")
+        (tmp_path / "second.txt").write_bytes(b"")
+        files = [
+            {
+                "filename": "first.txt",
+                "path": str(tmp_path),
+                "expected_hash": "1E50210A0202497FB79BC38B6ADE6C34",
+                "source_report": "checksum.md5",
+            },
+            {
+                "filename": "second.txt",
+                "path": str(tmp_path),
+                "expected_hash": "badhash",
+                "source_report": "checksum.md5",
+            },
+        ]
+        task = workflow_verify_checksums.ValidateChecksumBatchTask(files)
+        task.log = Mock()
+        assert task.work() is True
+        assert [result["valid"] for result in task.results] == [True, False]
+        assert [result["filename"] for result in task.results] == [
+            "first.txt", "second.txt"
+        ]
+
+    def test_work_hashes_shared_files_once(self, monkeypatch):
+        calculate_file_hash = Mock(return_value="abc123")
+        monkeypatch.setattr(
+            workflow_verify_checksums,
+            "calculate_file_hash",
+            calculate_file_hash
+        )
+        files = [
+            {
+                "filename": os.path.join("sub", "file.txt"),
+                "path": "root",
+                "expected_hash": "abc123",
+                "source_report": "checksum.md5",
+            },
+            {
+                "filename": "file.txt",
+                "path": os.path.join("root", "sub"),
+                "expected_hash": "badhash",
+                "source_report": os.path.join("sub", "checksum.md5"),
+            },
+        ]
+        task = workflow_verify_checksums.ValidateChecksumBatchTask(files)
+        task.log = Mock()
+        assert task.work() is True
+        calculate_file_hash.assert_called_once_with(
+            os.path.join("root", "sub", "file.txt")
+        )
+        assert [result["valid"] for result in task.results] == [True, False]
+
+
 class TestVerifyChecksumBatchSingleWorkflow:
     @pytest.fixture
     def workflow(self):
@@ -436,11 +614,13 @@ class TestChecksumTask:
             "path": os.path.join("some", "path"),
         }
 
-        calculate_md5 = Mock(return_value='42312efb063c44844cd96e47a19e3441')
+        calculate_file_hash = Mock(
+            return_value='42312efb063c44844cd96e47a19e3441'
+        )
         monkeypatch.setattr(
-            workflow_verify_checksums.hathi_validate.process,
-            "calculate_md5",
-            calculate_md5
+            workflow_verify_checksums,
+            "calculate_file_hash",
+            calculate_file_hash
         )
 
         task = workflow_verify_checksums.ChecksumTask(**job_args)
@@ -448,6 +628,9 @@ class TestChecksumTask:
         assert task.work() is True
         assert task.results["filename"] == "file.txt" and \
                task.results["valid"] is True
+        calculate_file_hash.assert_called_once_with(
+            os.path.join("some", "path", "file.txt")
+        )
 
     def test_work_non_matching(self, monkeypatch):
         job_args: workflow_verify_checksums.ReadChecksumTaskReport = {
@@ -457,11 +640,11 @@ class TestChecksumTask:
             "path": os.path.join("some", "path"),
         }
 
-        calculate_md5 = Mock(return_value='something_else')
+        calculate_file_hash = Mock(return_value='something_else')
         monkeypatch.setattr(
-            workflow_verify_checksums.hathi_validate.process,
-            "calculate_md5",
-            calculate_md5
+            workflow_verify_checksums,
+            "calculate_file_hash",
+            calculate_file_hash
         )
 
         task = workflow_verify_checksums.ChecksumTask(**job_args)
@@ -491,8 +674,30 @@ class TestChecksumTask:
         ),
         workflow_verify_checksums.ReadChecksumReportTask(
             checksum_file="checksum_file"
-        )
+        ),
+        workflow_verify_checksums.ValidateChecksumBatchTask(files=[]),
     ]
 )
 def test_tasks_have_description(task):
     assert task.task_description() is not None
+
+
+@pytest.mark.parametrize(
+    "sort_results",
+    [
+        workflow_verify_checksums.ChecksumWorkflow._sort_results,
+        workflow_verify_checksums.VerifyChecksumBatchSingleWorkflow
+        .sort_results,
+    ]
+)
+def test_sort_results_groups_by_report(sort_results):
+    results = [
+        {"checksum_report_file": "b.md5", "filename": "1.txt"},
+        {"checksum_report_file": "a.md5", "filename": "2.txt"},
+        {"checksum_report_file": "b.md5", "filename": "3.txt"},
+    ]
+    sorted_results = sort_results(results)
+    assert list(sorted_results) == ["a.md5", "b.md5"]
+    assert [item["filename"] for item in sorted_results["b.md5"]] == [
+        "1.txt", "3.txt"
+    ]
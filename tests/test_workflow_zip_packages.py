@@ -87,25 +87,19 @@ class TestZipPackagesWorkflow:
 
     def test_discover_task_metadata(
             self,
-            monkeypatch,
+            tmp_path,
             workflow,
             default_options
     ):
-        import os
         user_args = default_options.copy()
-        user_args["Source"] = os.path.join("some", "source")
-        user_args["Output"] = os.path.join("some", "output")
+        user_args["Source"] = str(tmp_path)
+        user_args["Output"] = "output"
+        (tmp_path / "something").mkdir()
+        (tmp_path / "something.txt").touch()
 
         initial_results = []
         additional_data = {}
 
-        def scandir(root):
-            results = [
-                Mock(path=os.path.join(root, "something.txt"))
-            ]
-            return results
-
-        monkeypatch.setattr(workflow_zip_packages.os, "scandir", scandir)
         task_metadata = \
             workflow.discover_task_metadata(
                 initial_results=initial_results,
@@ -114,30 +108,51 @@ class TestZipPackagesWorkflow:
             )
 
         assert len(task_metadata) == 1 and \
-               task_metadata[0]['source_path'] == \
-               os.path.join(user_args["Source"], "something.txt")
+               task_metadata[0]['source_paths'] == \
+               [str(tmp_path / "something")]
+
+    def test_discover_task_metadata_batches_folders(
+            self,
+            tmp_path,
+            workflow,
+            default_options
+    ):
+        user_args = default_options.copy()
+        user_args["Source"] = str(tmp_path)
+        user_args["Output"] = "output"
+        batch_size = workflow_zip_packages.ZIP_BATCH_SIZE
+        for index in range(batch_size + 1):
+            (tmp_path / str(index)).mkdir()
+
+        task_metadata = workflow.discover_task_metadata(
+            initial_results=[],
+            additional_data={},
+            user_args=user_args
+        )
+        assert [len(job["source_paths"]) for job in task_metadata] == \
+            [batch_size, 1]
 
     def test_create_new_task(self, workflow, monkeypatch):
         import os
         job_args = {
-            "source_path": os.path.join("some", "source", "path"),
+            "source_paths": [os.path.join("some", "source", "path")],
             "destination_path": os.path.join("some", "destination", "path"),
         }
         task_builder = Mock()
-        ZipTask = Mock()
-        ZipTask.name = "ZipTask"
+        ZipBatchTask = Mock()
+        ZipBatchTask.name = "ZipBatchTask"
         monkeypatch.setattr(
             workflow_zip_packages,
-            "ZipTask",
-            ZipTask
+            "ZipBatchTask",
+            ZipBatchTask
         )
 
         workflow.create_new_task(task_builder, job_args)
 
         assert task_builder.add_subtask.called is True
 
-        ZipTask.assert_called_with(
-            source_path=job_args['source_path'],
+        ZipBatchTask.assert_called_with(
+            source_paths=job_args['source_paths'],
             destination_path=job_args['destination_path']
         )
 
@@ -173,9 +188,101 @@ class TestZipTask:
         )
 
 
-def test_tasks_have_description():
-    task = workflow_zip_packages.ZipTask(
+class TestZipBatchTask:
+    def test_work(self, monkeypatch):
+        import os
+        source_paths = ["first", "second"]
+        destination_path = "destination"
+        task = workflow_zip_packages.ZipBatchTask(
+            source_paths=source_paths,
+            destination_path=destination_path
+        )
+        task.log = Mock()
+        compress_folder_inplace = Mock()
+        monkeypatch.setattr(
+            workflow_zip_packages.hathizip.process,
+            "compress_folder_inplace",
+            compress_folder_inplace
+        )
+
+        assert task.work() is True
+        compress_folder_inplace.assert_any_call(
+            path="first",
+            dst=destination_path
+        )
+        compress_folder_inplace.assert_any_call(
+            path="second",
+            dst=destination_path
+        )
+        assert task.results == [
+            os.path.join(destination_path, "first.zip"),
+            os.path.join(destination_path, "second.zip"),
+        ]
+
+
+def test_zip_batch_task_keeps_hathizip_messages_per_folder(monkeypatch):
+    import logging
+    import threading
+    hathizip_logger = logging.getLogger(
+        workflow_zip_packages.hathizip.__name__
+    )
+    original_level = hathizip_logger.level
+    zipped_by = {}
+
+    def compress_folder_inplace(path, dst):
+        zipped_by[path] = threading.get_ident()
+        hathizip_logger.info(f"compressing {path}")
+
+    monkeypatch.setattr(
+        workflow_zip_packages.hathizip.process,
+        "compress_folder_inplace",
+        compress_folder_inplace
+    )
+    task = workflow_zip_packages.ZipBatchTask(
+        source_paths=["first", "second"],
+        destination_path="destination"
+    )
+    messages = []
+    task.log = lambda message: messages.append(
+        (threading.get_ident(), message)
+    )
+    assert task.work() is True
+    for path, thread_id in zipped_by.items():
+        assert [
+            thread for thread, message in messages
+            if message.endswith(f"compressing {path}")
+        ] == [thread_id]
+    assert hathizip_logger.level == original_level
+
+
+def test_zip_folder_returns_zip_file(monkeypatch):
+    import os
+    monkeypatch.setattr(
+        workflow_zip_packages.hathizip.process,
+        "compress_folder_inplace",
+        Mock()
+    )
+    log = Mock()
+    assert workflow_zip_packages.zip_folder(
+        os.path.join("some", "package"), "destination", log
+    ) == os.path.join("destination", "package.zip")
+    log.assert_called_with(
+        f"Created {os.path.join('destination', 'package.zip')}"
+    )
+
+
+@pytest.mark.parametrize(
+    "task",
+    [
+        workflow_zip_packages.ZipTask(
             source_path="source_path",
             destination_path="destination_path"
-        )
+        ),
+        workflow_zip_packages.ZipBatchTask(
+            source_paths=["source_path"],
+            destination_path="destination_path"
+        ),
+    ]
+)
+def test_tasks_have_description(task):
     assert task.task_description() is not None